@@ -1,12 +1,49 @@
-from checker import Checker
-from board import Board
+from checker import NEIGHBOURS, PIECE_STEPS, PIECE_NEIGHBOURS, SIMPLE_MOVES, DARK_SQUARES
+from rules import Rules
+import time
+import json
 from random import randrange
+from collections import defaultdict
+from stats import SearchStats
+from notation import parse_position
+from transposition import ZOBRIST, WHITE_TO_MOVE, EXACT, LOWER, UPPER, TranspositionTable, position_key
+
+class SearchTimeout(Exception): # Raised inside the search when the time budget runs out or the search is stopped
+    pass
+
 
 class AI():
     # Static Variables
     max_depth = 5
+    max_iterations = 64 # Deepest iteration tried by a time limited search
+    check_interval = 1024 # Nodes between clock checks
+    noise = True # Add random noise to evaluations (disable for reproducible searches)
+    window = 1e-9 # Root window margin used to resolve ties exactly like minimax
+    keep_table = True # Keep transposition table entries between searches and positions so the next search reuses them
+    quiescence = True # Extend the search past max_depth while captures are forced
+    max_quiescence = 16 # Plies the quiescence extension may add
+    weights = {"man": 1, "king": 3, "capture": 0.55, "mobility": 0.08, "center": 0.2, "promotion": 0.45} # Evaluation weights; AI(weights=...) overrides any of them
+    tablebase_win = 1000 # Score of a tablebase win for the winner; the distance in plies is subtracted so faster wins score higher
+
+    def __init__(self, alpha_beta: bool = True, table_size: int = TranspositionTable.default_size, book=None, tablebase=None, weights: dict | None = None) -> None:
+        self.__alpha_beta = alpha_beta
+        unknown = set(weights or {}) - set(self.weights)
+        if unknown:
+            raise ValueError(f"unknown evaluation weights: {', '.join(sorted(unknown))}")
+        self.__weights = {**self.weights, **(weights or {})}
+        self.__eval_weights = tuple(self.__weights.values()) # Unpacked by evaluate
+        self.__book = book # Optional book.OpeningBook consulted before searching
+        self.__tablebase = tablebase # Optional tablebase.Tablebase giving exact results of positions with few pieces
+        self.__nodes = 0
+        self.__killers = defaultdict(list)
+        self.__buffers = [] # One move list per ply, refilled by every alpha_beta node at that depth
+        self.__table = TranspositionTable(table_size) if alpha_beta and table_size else None # Transposition table (alpha-beta only)
+        self.__deadline = None # perf_counter() value after which a time limited search stops
+        self.__stopped = False # Set from another thread to abort the running search
+        self.__completed_depth = -1
+        self.__score = None # Evaluation of the last root search's move
+        self.__stats = None # SearchStats while enabled
 
-    def __init__(self) -> None:
         self.__num_white = 12
         self.__num_black = 12
 
@@ -26,8 +63,31 @@ class AI():
         self.__capture_stack = []
         self.__king_stack = []
 
+        self.__key = position_key(self.__board, 1) # Zobrist key of the pieces (side to move is added when probing)
+
+        # Evaluation terms kept up to date by make_move/undo_move
+        self.__center = 0 # Sum of piece values in rows 3-4, columns 2-5
+        self.__black_near = 0 # Black men in rows 1-2
+        self.__white_near = 0 # White men in rows 5-6
+
+
+    @classmethod
+    def from_position(cls, position: str | bytes, **kwargs) -> tuple: # Build an AI (kwargs go to __init__) from a FEN string or binary position (see notation); return (ai, side to move)
+        board, color = parse_position(position)
+        ai = cls(**kwargs)
+        ai.set_board(board)
+        return ai, color
+
+
+    def update_move(self, board: Rules) -> None: # Update the AI's copy of the board
+        self.set_board([[board.get_piece(j, i) for j in range(8)] for i in range(8)])
+
+
+    def get_board(self) -> list[list[int]]: # Return a copy of the AI's board (rows of 0, 1/-1 for men, 2/-2 for kings)
+        return [row[:] for row in self.__board]
 
-    def update_move(self, board: Board) -> None: # Update the AI's copy of the board
+
+    def set_board(self, board: list[list[int]]) -> None: # Load a position given as rows of 0, 1/-1 for men, 2/-2 for kings
         self.__num_black = 0
         self.__num_white = 0
         self.__num_black_king = 0
@@ -35,8 +95,8 @@ class AI():
 
         for i in range(8):
             for j in range(8):
-                self.__board[i][j] = board.get_piece(j, i)
-                
+                self.__board[i][j] = board[i][j]
+
                 if 1 == self.__board[i][j]:
                     self.__num_black += 1
 
@@ -49,154 +109,559 @@ class AI():
                 elif -2 == self.__board[i][j]:
                     self.__num_white_king += 1
 
+        self.__center = self.__black_near = self.__white_near = 0
+        for i in range(8):
+            for j in range(8):
+                if self.__board[i][j]:
+                    self.track(j, i, self.__board[i][j], 1)
 
-    def get_legal(self, x: int, y: int, color: int) -> list[tuple]: # Return all moves of a Checker that are within the board boundary
-        possible_moves = [(x + 1, y - color),
-                          (x - 1, y - color)]
-        
-        if 2 == self.__board[y][x] or -2 == self.__board[y][x]:
-            possible_moves.extend([(x + 1, y + color),
-                                   (x - 1, y + color)])
+        self.__key = position_key(self.__board, 1)
+        if self.__table and not self.keep_table: # Entries are keyed by position, so they only need clearing when reuse is off
+            self.__table.clear()
 
-        legal = []
-        for move in possible_moves:
-            if Checker.in_bounds(move):
-                legal.append(move)
 
-        return legal
+    def get_legal(self, x: int, y: int, color: int) -> tuple: # Return all moves of a Checker that are within the board boundary
+        return NEIGHBOURS[color, 2 == self.__board[y][x] or -2 == self.__board[y][x]][y][x]
     
 
-    def capturable(self, x: int, y: int, color: int, capture_depth: int) -> list[tuple]: # Return capture chains for the given Checker
-        captures = []
+    def capturable(self, x: int, y: int, color: int, capture_depth: int, captures: list | None = None, path: tuple = ()) -> list[tuple]: # Return capture chains for the given Checker
+        # Chains are appended to `captures`; `path` holds the squares visited before this one and is only extended when a jump is found
+        if captures is None:
+            captures = []
         self.promote(x, y) # Promote if possible
-        legal_moves = self.get_legal(x, y, color)
+        board = self.__board
 
-        for move in legal_moves:
-            if self.__board[move[1]][move[0]] and self.__board[move[1]][move[0]] / color < 0: # Check if an enemy piece is on the target square
-                move_x, move_y = move
-                if Checker.in_bounds((2 * move_x - x, 2 * move_y - y)) and not self.__board[2 * move_y - y][2 * move_x - x]: # Check if the square after jumping is in bounds and empty
-                    self.__board[2 * move_y - y][2 * move_x - x] = self.__board[y][x] # Place the piece on new square
-                    capture_chain = self.capturable(2 * move_x - x, 2 * move_y - y, color, capture_depth + 1) # Recursively grow capture chain
-                    self.__board[2 * move_y - y][2 * move_x - x] = 0 # Remove piece from new square (post recursion cleanup)
+        for (move_x, move_y), landing in PIECE_STEPS[board[y][x]][y][x]:
+            if landing and board[move_y][move_x] * color < 0: # Check if an enemy piece is on the target square and the square after jumping is in bounds
+                land_x, land_y = landing
+                if not board[land_y][land_x]: # Check if the square after jumping is empty
+                    found = len(captures)
+                    board[land_y][land_x] = board[y][x] # Place the piece on new square
+                    self.capturable(land_x, land_y, color, capture_depth + 1, captures, path + (x, y)) # Recursively grow capture chain
+                    board[land_y][land_x] = 0 # Remove piece from new square (post recursion cleanup)
 
-                    if capture_chain: # Add capture chain to list if it exists
-                        for cap in capture_chain:
-                            chain = [cap[0], x, y] + [i for i in cap[1:]]
-                            captures.append(tuple(chain))
-
-                    else: # Add single capture otherwise
-                        captures.append((capture_depth, x, y, 2 * move_x - x, 2 * move_y - y))
+                    if len(captures) == found: # The chain ends with this capture
+                        captures.append((capture_depth, *path, x, y, land_x, land_y))
 
         self.demote(x, y) # Demote if necessary
         return captures
     
 
-    def possible_captures(self, color: int) -> list[tuple]: # Loop through side's checkers and check for possible captures
-        captures = []
-        
-        for i in range(8):
-            for j in range(8):
-                if self.__board[i][j] / color > 0:
-                    captures.extend(self.capturable(j, i, color, 1))
+    def possible_captures(self, color: int, captures: list | None = None) -> list[tuple]: # Loop through side's checkers and check for possible captures (appended to captures if given)
+        if captures is None:
+            captures = []
+
+        for x, y in DARK_SQUARES:
+            if self.__board[y][x] * color > 0:
+                self.capturable(x, y, color, 1, captures)
 
         return captures
 
     
-    def movable(self, x: int, y: int, color: int) -> list[tuple]: # Return legal moves for given checker
-        moves = []
-        legal_moves = self.get_legal(x, y, color)
-
-        for move in legal_moves:
-            if not self.__board[move[1]][move[0]]:
-                moves.append((0, x, y, move[0], move[1]))
+    def movable(self, x: int, y: int, color: int, moves: list | None = None) -> list[tuple]: # Return legal moves for given checker (appended to moves if given)
+        if moves is None:
+            moves = []
+        board = self.__board
+        for (move_x, move_y), move in SIMPLE_MOVES[board[y][x]][y][x]:
+            if not board[move_y][move_x]:
+                moves.append(move)
         
         return moves
     
 
-    def possible_moves(self, color: int) -> list[tuple]: # Loop through side's checkers and check for possible moves
-        moves = []
+    def possible_moves(self, color: int, moves: list | None = None) -> list[tuple]: # Loop through side's checkers and check for possible moves (appended to moves if given)
+        if moves is None:
+            moves = []
         
-        for i in range(8):
-            for j in range(8):
-                if self.__board[i][j] / color > 0:
-                    moves.extend(self.movable(j, i, color))
+        for x, y in DARK_SQUARES:
+            if self.__board[y][x] * color > 0:
+                self.movable(x, y, color, moves)
 
         return moves
 
+
+    def count_moves(self, color: int) -> int: # Count a side's simple moves without building them; -1 as soon as a capture is found (captures are forced)
+        board = self.__board
+        count = 0
+        for x, y in DARK_SQUARES:
+            if board[y][x] * color > 0:
+                for (move_x, move_y), landing in PIECE_STEPS[board[y][x]][y][x]:
+                    if not board[move_y][move_x]:
+                        count += 1
+                    elif landing and board[move_y][move_x] * color < 0 and not board[landing[1]][landing[0]]:
+                        return -1
+
+        return count
+
+
+    def legal_move(self, move: tuple, color: int) -> bool: # Check if a simple move (e.g. from the transposition table) can be played here, assuming no capture is forced
+        _, x, y, move_x, move_y = move
+        return self.__board[y][x] * color > 0 and not self.__board[move_y][move_x] and (move_x, move_y) in self.get_legal(x, y, color)
+
+
+    def search_order(self, color: int, depth: int, moves: list[tuple], best: tuple | None): # Yield the moves of an interior node in search order, generating them lazily
+        # moves is the ply's buffer holding the captures; it is sorted in place, and refilled with the simple moves if there are none
+        if moves:
+            moves.sort(key=self.move_priority(color, depth, best), reverse=True)
+            yield from moves
+            return
+
+        # The stored best move goes first anyway; if it causes a cutoff the other moves are never generated
+        if best is not None and not best[0] and self.legal_move(best, color):
+            yield best
+        else:
+            best = None
+
+        self.possible_moves(color, moves)
+        moves.sort(key=self.move_priority(color, depth, best), reverse=True)
+        for move in moves:
+            if move != best:
+                yield move
+
     
-    def get_best_move(self, color: int, depth: int) -> float | tuple: # Return the best move/evaluation of current position
-        if depth <= self.max_depth:
-            best = float("inf") if color == -1 else float("-inf")
-            
-            # First check for possible captures and act on that
-            captures = self.possible_captures(color)
-            if captures:
-                best = self.backtrack(captures, color, depth)
-            
-            # If no captures, look for legal moves
-            else:
-                moves = self.possible_moves(color)
-                if moves:
-                    best = self.backtrack(moves, color, depth)
+    def get_nodes(self) -> int: # Return number of nodes visited by the last search
+        return self.__nodes
+
+
+    def get_key(self, color: int) -> int: # Return the Zobrist key of the current position with the given side to move
+        return self.__key ^ WHITE_TO_MOVE if -1 == color else self.__key
+
+
+    def get_table_stats(self) -> dict: # Return transposition table counters (hit rate, occupancy)
+        return self.__table.get_stats() if self.__table else {}
+
+
+    def get_pv(self, color: int) -> list[tuple]: # Return the principal variation from the current position, following the best moves stored in the transposition table
+        pv = []
+        seen = set()
+        while self.__table:
+            key = self.get_key(color)
+            entry = self.__table.probe(key)
+            if not entry or key in seen or entry[4] not in self.root_moves(color): # Stop at missing entries, cycles and key collisions
+                break
+
+            seen.add(key)
+            pv.append(entry[4])
+            self.make_move(entry[4])
+            color = -color
+
+        for _ in pv:
+            self.undo_move()
+
+        return pv
+
+
+    def get_weights(self) -> dict: # Return the evaluation weights this AI uses
+        return dict(self.__weights)
+
+
+    @staticmethod
+    def load_weights(path: str) -> dict: # Read evaluation weights saved by tuning.py (or any JSON object of weights) for AI(weights=...)
+        with open(path) as file:
+            weights = json.load(file)
+        return weights.get("weights", weights)
+
+
+    def get_score(self) -> float | None: # Return the evaluation (positive favours black) of the move the last alpha-beta search returned (None for book/tablebase moves)
+        return self.__score
+
+
+    def get_depth(self) -> int: # Return the max_depth of the deepest iteration finished by the last time limited search
+        return self.__completed_depth
+
+
+    def enable_stats(self, profile: bool = False) -> None: # Record stats for every search (profile also runs cProfile around it); costs nothing while disabled
+        self.disable_stats()
+        self.__stats = SearchStats(self, profile)
+        self.__stats.attach()
+
+
+    def disable_stats(self) -> None: # Stop recording stats
+        if self.__stats:
+            self.__stats.detach()
+            self.__stats = None
+
+
+    def get_stats(self) -> dict | None: # Return the last search's stats (None if stats are disabled)
+        return self.__stats.get_stats() if self.__stats else None
+
+
+    def stop(self) -> None: # Ask the running alpha-beta search to return as soon as possible (safe to call from another thread)
+        self.__stopped = True
+
 
-            return best
+    def resume(self) -> None: # Allow searching again after stop()
+        self.__stopped = False
 
+
+    def get_best_move(self, color: int, depth: int, time_limit: int | None = None) -> float | tuple | None: # Return the best move/evaluation of current position (None if stopped before any move was found)
+        if not depth:
+            if time_limit is not None and not self.__alpha_beta:
+                raise ValueError("time limited searches need alpha-beta (AI(alpha_beta=False) only searches to max_depth)")
+            self.__nodes = 0
+            self.__score = None
+            if self.__table:
+                self.__table.new_search() # Older results stay usable but give way to this search's
+            if self.__book:
+                book_move = self.__book.choose(self.get_key(color), self.root_moves(color))
+                if book_move:
+                    return book_move
+
+            if self.tablebase_covers():
+                tablebase_move = self.tablebase_move(color)
+                if tablebase_move:
+                    return tablebase_move
+
+            if time_limit is not None:
+                return self.iterative_deepening(color, time_limit)
+            if self.__alpha_beta:
+                state = self.__save_state()
+                try:
+                    return self.search_root(color)
+                except SearchTimeout:
+                    self.__restore_state(state)
+                    return None
+
+        self.__nodes += 1
+        if depth and self.tablebase_covers():
+            return self.tablebase_score(color)
+
+        # First check for possible captures and act on that
+        captures = self.possible_captures(color)
+        if self.horizon(depth, captures):
+            return self.evaluate(color, captures)
+
+        best = float("inf") if color == -1 else float("-inf")
+        if captures:
+            best = self.backtrack(captures, color, depth)
+
+        # If no captures, look for legal moves
         else:
-            return self.evaluate(color)
+            moves = self.possible_moves(color)
+            if moves:
+                best = self.backtrack(moves, color, depth)
+
+        return best
 
     
+    def horizon(self, depth: int, captures: list[tuple]) -> bool: # Check if the search stops and evaluates here (past max_depth, unless forced captures are pending)
+        if depth <= self.max_depth:
+            return False
+
+        # Quiescence: keep following capture chains so the evaluation never lands in the middle of an exchange
+        return not (self.quiescence and captures and depth <= self.max_depth + self.max_quiescence)
+
+
     def backtrack(self, moves: list[tuple], color: int, depth: int) -> float | tuple: # Implement backtracking algorithm to traverse all decision trees
         best_move = best_eval = float("inf") if color == -1 else float("-inf")
 
         for move in moves:
-            self.__move_stack.append(move)
-            self.make_move()
+            self.make_move(move)
             
             # Update position evaluation based on minimax algorithm
             move_eval = self.get_best_move(-color, depth + 1)
-            if move_eval and (move_eval <= best_eval if color == -1 else move_eval >= best_eval):
+            if move_eval <= best_eval if color == -1 else move_eval >= best_eval:
                 best_move = move
                 best_eval = move_eval
 
             self.undo_move()
-            self.__move_stack.pop()
         
         return best_eval if depth else best_move # Return best evaluation at every step; at first step, return best move to execute
+
+
+    def order_moves(self, moves: list[tuple], color: int, depth: int, best: tuple | None = None) -> list[tuple]: # Sort moves so that cutoffs happen as early as possible
+        return sorted(moves, key=self.move_priority(color, depth, best), reverse=True)
+
+
+    def move_priority(self, color: int, depth: int, best: tuple | None = None): # Return the sort key used by order_moves (higher is searched first)
+        killers = self.__killers[depth]
+        promotion_row = 0 if 1 == color else 7
+        board = self.__board
+
+        def priority(move: tuple) -> int:
+            score = move[0] # Longer capture chains first
+            if board[move[2]][move[1]] == color and move[-1] == promotion_row: # Men reaching the last row
+                score += 10
+            if move in killers: # Moves that caused a cutoff at this depth before
+                score += 20
+            if move == best: # Best move stored in the transposition table
+                score += 40
+            return score
+
+        return priority
+
+
+    def store_killer(self, move: tuple, depth: int) -> None: # Remember a move that caused a cutoff (keep the 2 most recent)
+        killers = self.__killers[depth]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+
+
+    def iterative_deepening(self, color: int, time_limit: int) -> float | tuple: # Deepen one ply at a time until time_limit milliseconds have passed
+        start = time.perf_counter()
+        saved_depth = self.__dict__.get("max_depth")
+        state = self.__save_state()
+        best_move = None
+        self.__completed_depth = -1
+
+        try:
+            for depth in range(self.max_iterations):
+                self.max_depth = depth
+                try:
+                    # The first iteration always finishes (unless stopped) so there is a move to return
+                    best_move = self.search_root(color)
+                except SearchTimeout:
+                    self.__restore_state(state)
+                    break
+
+                self.__completed_depth = depth
+                if not isinstance(best_move, tuple): # No legal moves
+                    break
+
+                # Each iteration's best line stays in the transposition table and is tried first by the next one
+                self.__deadline = start + time_limit / 1000
+                if time.perf_counter() >= self.__deadline:
+                    break
+
+        finally:
+            self.__deadline = None
+            if saved_depth is None:
+                del self.max_depth
+            else:
+                self.max_depth = saved_depth
+
+        return best_move
+
+
+    def __save_state(self) -> tuple: # Snapshot the position so an interrupted search can be rolled back
+        return ([row[:] for row in self.__board], self.__num_black, self.__num_white, self.__num_black_king, self.__num_white_king,
+                self.__key, self.__center, self.__black_near, self.__white_near, len(self.__move_stack), len(self.__capture_stack), len(self.__king_stack))
+
+
+    def __restore_state(self, state: tuple) -> None: # Roll back to a snapshot taken by __save_state
+        board, self.__num_black, self.__num_white, self.__num_black_king, self.__num_white_king, self.__key, self.__center, self.__black_near, self.__white_near, moves, captures, kings = state
+        for i in range(8):
+            self.__board[i][:] = board[i]
+
+        del self.__move_stack[moves:]
+        del self.__capture_stack[captures:]
+        del self.__king_stack[kings:]
+
+
+    def tablebase_covers(self) -> bool: # Check if the tablebase holds the exact result of the current position
+        if self.__tablebase is None:
+            return False
+
+        black = self.__num_black + self.__num_black_king
+        white = self.__num_white + self.__num_white_king
+        return bool(black and white) and black + white <= self.__tablebase.get_max_pieces()
+
+
+    def tablebase_score(self, color: int) -> float: # Return the exact evaluation of a covered position (0 for a draw)
+        outcome, distance = self.__tablebase.probe(self.get_key(color))
+        return outcome * color * (self.tablebase_win - distance)
+
+
+    def tablebase_move(self, color: int) -> tuple | None: # Return the fastest win, else a drawing move, else the longest loss
+        best_move, best_eval = None, float("-inf")
+        for move in self.root_moves(color):
+            self.make_move(move)
+            if self.tablebase_covers():
+                move_eval = self.tablebase_score(-color) * color
+            else: # The move captured the opponent's last piece
+                move_eval = float("inf")
+            self.undo_move()
+
+            if move_eval > best_eval:
+                best_move, best_eval = move, move_eval
+
+        return best_move
+
+
+    def root_moves(self, color: int) -> list[tuple]: # Moves available at the root (captures are forced)
+        return self.possible_captures(color) or self.possible_moves(color)
+
+
+    def search_move(self, move: tuple, color: int, alpha: float = float("-inf"), beta: float = float("inf")) -> float: # Return the evaluation of a single root move (exact inside the window, a bound outside it)
+        self.__nodes = 0
+        self.make_move(move)
+        if self.__alpha_beta:
+            move_eval = self.alpha_beta(-color, 1, alpha, beta)
+        else:
+            move_eval = self.get_best_move(-color, 1)
+        self.undo_move()
+
+        return move_eval
+
+
+    def search_root(self, color: int) -> float | tuple: # Alpha-beta search at the root; returns the same move as backtrack
+        moves = self.possible_captures(color)
+        if not moves:
+            moves = self.possible_moves(color)
+
+        self.__nodes += 1
+        best_move = best_eval = float("inf") if color == -1 else float("-inf")
+        if not moves:
+            return best_eval
+
+        # Keep the original index so ties are broken like minimax (the later move wins)
+        indices = {move: idx for idx, move in enumerate(moves)}
+        best_idx = -1
+
+        entry = self.__table.probe(self.get_key(color)) if self.__table else None
+        for move in self.order_moves(moves, color, 0, entry[4] if entry else None):
+            # Search just below/above the current best so equal evaluations come back exact
+            if 1 == color:
+                alpha, beta = best_eval - self.window, float("inf")
+            else:
+                alpha, beta = float("-inf"), best_eval + self.window
+
+            self.make_move(move)
+            move_eval = self.alpha_beta(-color, 1, alpha, beta)
+            self.undo_move()
+
+            idx = indices[move]
+            if move_eval == best_eval and idx > best_idx or (move_eval < best_eval if color == -1 else move_eval > best_eval):
+                best_move, best_eval, best_idx = move, move_eval, idx
+
+        if self.__table:
+            self.__table.store(self.get_key(color), self.max_depth + 1, best_eval, EXACT, best_move)
+
+        self.__score = best_eval
+        return best_move
+
+
+    def alpha_beta(self, color: int, depth: int, alpha: float, beta: float) -> float: # Fail-soft alpha-beta search returning the evaluation of the position
+        self.__nodes += 1
+        if not self.__nodes % self.check_interval and (self.__stopped or self.__deadline and time.perf_counter() > self.__deadline):
+            raise SearchTimeout()
+
+        if self.tablebase_covers(): # Exact result, no need to search
+            return self.tablebase_score(color)
+
+        remaining = self.max_depth + 1 - depth # Plies left to search below this node
+
+        # Look up previous results for this position
+        best = None
+        if self.__table:
+            key = self.get_key(color)
+            entry = self.__table.probe(key)
+            if entry:
+                _, entry_depth, score, bound, best = entry
+                if entry_depth >= remaining:
+                    if EXACT == bound:
+                        return score
+                    elif LOWER == bound:
+                        alpha = max(alpha, score)
+                    else:
+                        beta = min(beta, score)
+
+                    if alpha >= beta:
+                        return score
+
+        # One pass counts the simple moves and stops at the first capture; captures are forced, so only then are the chains generated (into this ply's buffer).
+        # Leaves hand both to evaluate for the mobility term
+        buffers = self.__buffers
+        while len(buffers) <= depth:
+            buffers.append([])
+        captures = buffers[depth]
+        captures.clear()
+        num_moves = self.count_moves(color)
+        if num_moves < 0:
+            self.possible_captures(color, captures)
+
+        if self.horizon(depth, captures):
+            evaluation = self.evaluate(color, captures, num_moves)
+            if self.__table: # A quiet position evaluates the same at any remaining depth; a cut off capture sequence only this deep
+                self.__table.store(key, remaining if captures else 0, evaluation, EXACT, None)
+            return evaluation
+
+        alpha_orig, beta_orig = alpha, beta
+        best_move = None
+        best_eval = float("inf") if color == -1 else float("-inf")
+        for move in self.search_order(color, depth, captures, best):
+            self.make_move(move)
+            move_eval = self.alpha_beta(-color, depth + 1, alpha, beta)
+            self.undo_move()
+
+            if 1 == color: # Maximizing side (black)
+                if move_eval > best_eval or best_move is None:
+                    best_move, best_eval = move, move_eval
+                    alpha = max(alpha, best_eval)
+
+            else: # Minimizing side (white)
+                if move_eval < best_eval or best_move is None:
+                    best_move, best_eval = move, move_eval
+                    beta = min(beta, best_eval)
+
+            if alpha >= beta: # Cutoff - the opponent will avoid this line
+                self.store_killer(move, depth)
+                break
+
+        if best_move is None: # No moves or captures - the side to move loses
+            return best_eval
+
+        if self.__table:
+            if best_eval <= alpha_orig:
+                bound = UPPER
+            elif best_eval >= beta_orig:
+                bound = LOWER
+            else:
+                bound = EXACT
+            self.__table.store(key, remaining, best_eval, bound, best_move)
+
+        return best_eval
     
 
-    def evaluate(self, color: int) -> float: # Evaluation function
+    def evaluate(self, color: int, captures: list[tuple] | None = None, num_moves: int | None = None) -> float: # Evaluation function; pass the captures and count_moves result already found for this position to avoid generating them again
+        man, king, capture, mobility, center, promotion = self.__eval_weights
+
         # Count difference in pieces; give extra weight to difference in number of kings
-        piece_diff = self.__num_black - self.__num_white + 3 * (self.__num_black_king - self.__num_white_king)
+        piece_diff = man * (self.__num_black - self.__num_white) + king * (self.__num_black_king - self.__num_white_king)
         
         # Count number of moves (Having more moves/options - good)
         pos_moves_eval = 0
 
-        pos_moves = self.possible_captures(color)
-        if pos_moves:
-            pos_moves_eval = len(pos_moves) * 0.55 * color # Give high evaluations to positions with multiple captures
+        if num_moves is None:
+            num_moves = self.count_moves(color)
+        if captures is None:
+            captures = self.possible_captures(color) if num_moves < 0 else ()
+
+        if captures:
+            pos_moves_eval = len(captures) * capture * color # Give high evaluations to positions with multiple captures
 
         else:
-            pos_moves = self.possible_moves(color)
-            if not pos_moves: # If no moves or captures are possible, the game is lost
+            if not num_moves: # If no moves or captures are possible, the game is lost
                 pos_moves_eval = float("inf") if color == -1 else float("-inf")
             
             else:
-                pos_moves_eval = len(pos_moves) * 0.08 * color # Give low evaluations to positions with moves since on average there are more possible moves than captures
+                pos_moves_eval = num_moves * mobility * color # Give low evaluations to positions with moves since on average there are more possible moves than captures
         
-        # Calculate central control
-        central_control_eval = sum([sum(row[2:6]) for row in self.__board[3:5]]) * 0.2 # Give a medium evaluation for central control
+        # Calculate central control (sum of piece values in rows 3-4, columns 2-5)
+        central_control_eval = self.__center * center # Give a medium evaluation for central control
         
-        # Calculate opponent's proximity to promotion
-        consider_rows = self.__board[1:3] if -1 == color else self.__board[5:7]
-        promotion_proximity_eval = sum([-color for row in consider_rows for elem in row if elem == -color]) * 0.45 # Give a high medium weightage to prevent opponent from promoting
+        # Calculate opponent's proximity to promotion (opponent's men in the 2 rows before their last row)
+        promotion_proximity_eval = (self.__black_near if -1 == color else -self.__white_near) * promotion # Give a high medium weightage to prevent opponent from promoting
 
         # Evaluation calculation
         evaluation = piece_diff + pos_moves_eval + central_control_eval + promotion_proximity_eval
-        return evaluation + randrange(-50, 51) / 715 # Adding some random noise to ensure minor differentiation between 2 "equally good" moves
+        if self.noise:
+            evaluation += randrange(-50, 51) / 715 # Adding some random noise to ensure minor differentiation between 2 "equally good" moves
+        return evaluation
     
 
-    def make_move(self) -> None: # Execute a move locally to generate new positions during backtracking algorithm
-        move = self.__move_stack[-1]
+    def track(self, x: int, y: int, piece: int, sign: int) -> None: # Add (sign 1) or remove (sign -1) a piece's share of the incremental evaluation terms
+        if 3 <= y <= 4 and 2 <= x <= 5:
+            self.__center += sign * piece
+        elif 1 == piece and 1 <= y <= 2:
+            self.__black_near += sign
+        elif -1 == piece and 5 <= y <= 6:
+            self.__white_near += sign
+
+
+    def make_move(self, move: tuple) -> None: # Execute a move locally to generate new positions during backtracking algorithm
+        self.__move_stack.append(move)
         
         # Execute capture chain
         if move[0]:
@@ -216,9 +681,16 @@ class AI():
                 elif -2 == self.__board[cap_y][cap_x]:
                     self.__num_white_king -= 1
                 
+                if self.__board[cap_y][cap_x]:
+                    self.__key ^= ZOBRIST[cap_y][cap_x][self.__board[cap_y][cap_x]]
+                    self.track(cap_x, cap_y, self.__board[cap_y][cap_x], -1)
+
                 self.__board[cap_y][cap_x] = 0
                 self.__board[move[start + 3]][move[start + 2]] = self.__board[move[start + 1]][move[start]]
                 self.__board[move[start + 1]][move[start]] = 0
+                self.track(move[start], move[start + 1], self.__board[move[start + 3]][move[start + 2]], -1)
+                self.track(move[start + 2], move[start + 3], self.__board[move[start + 3]][move[start + 2]], 1)
+                self.__key ^= ZOBRIST[move[start + 1]][move[start]][self.__board[move[start + 3]][move[start + 2]]] ^ ZOBRIST[move[start + 3]][move[start + 2]][self.__board[move[start + 3]][move[start + 2]]]
                 self.promote(move[start + 2], move[start + 3]) # Check and promote as necessary
                 
                 num_moves -= 1
@@ -228,11 +700,14 @@ class AI():
         else:
             self.__board[move[4]][move[3]] = self.__board[move[2]][move[1]]
             self.__board[move[2]][move[1]] = 0
+            self.track(move[1], move[2], self.__board[move[4]][move[3]], -1)
+            self.track(move[3], move[4], self.__board[move[4]][move[3]], 1)
+            self.__key ^= ZOBRIST[move[2]][move[1]][self.__board[move[4]][move[3]]] ^ ZOBRIST[move[4]][move[3]][self.__board[move[4]][move[3]]]
             self.promote(move[3], move[4]) # Check and promote as necessary
     
 
-    def undo_move(self) -> None: # Undo executed move while unravelling backtracking
-        move = self.__move_stack[-1]
+    def undo_move(self) -> None: # Undo the last executed move while unravelling backtracking
+        move = self.__move_stack.pop()
 
         # Undo capture chain
         if move[0]:
@@ -244,6 +719,9 @@ class AI():
                 cap_x, cap_y = (move[start] + move[start + 2]) // 2, (move[start + 1] + move[start + 3]) // 2
                 
                 self.__board[cap_y][cap_x] = self.__capture_stack.pop() # Restore previously captured piece by popping from stack
+                if self.__board[cap_y][cap_x]:
+                    self.__key ^= ZOBRIST[cap_y][cap_x][self.__board[cap_y][cap_x]]
+                    self.track(cap_x, cap_y, self.__board[cap_y][cap_x], 1)
 
                 if 1 == self.__board[cap_y][cap_x]:
                     self.__num_black += 1
@@ -256,6 +734,9 @@ class AI():
 
                 self.__board[move[start + 1]][move[start]] = self.__board[move[start + 3]][move[start + 2]]
                 self.__board[move[start + 3]][move[start + 2]] = 0
+                self.track(move[start + 2], move[start + 3], self.__board[move[start + 1]][move[start]], -1)
+                self.track(move[start], move[start + 1], self.__board[move[start + 1]][move[start]], 1)
+                self.__key ^= ZOBRIST[move[start + 1]][move[start]][self.__board[move[start + 1]][move[start]]] ^ ZOBRIST[move[start + 3]][move[start + 2]][self.__board[move[start + 1]][move[start]]]
                 
                 num_moves -= 1
                 start -= 2
@@ -265,15 +746,35 @@ class AI():
             self.demote(move[3], move[4]) # Check and demote as necessary
             self.__board[move[2]][move[1]] = self.__board[move[4]][move[3]]
             self.__board[move[4]][move[3]] = 0
+            self.track(move[3], move[4], self.__board[move[2]][move[1]], -1)
+            self.track(move[1], move[2], self.__board[move[2]][move[1]], 1)
+            self.__key ^= ZOBRIST[move[2]][move[1]][self.__board[move[2]][move[1]]] ^ ZOBRIST[move[4]][move[3]][self.__board[move[2]][move[1]]]
 
     
     def promote(self, x, y) -> None: # Promote piece to a king as necessary during backtracking
-        if (-1 == self.__board[y][x] and 7 == y) or (1 == self.__board[y][x] and 0 == y):
+        promoted = (-1 == self.__board[y][x] and 7 == y) or (1 == self.__board[y][x] and 0 == y)
+        if promoted:
+            if 1 == self.__board[y][x]:
+                self.__num_black -= 1
+                self.__num_black_king += 1
+            else:
+                self.__num_white -= 1
+                self.__num_white_king += 1
+
+            self.__key ^= ZOBRIST[y][x][self.__board[y][x]] ^ ZOBRIST[y][x][2 * self.__board[y][x]]
             self.__board[y][x] *= 2
-            self.__king_stack.append((x,y)) # Store promotion square to non-destructively demote while unravelling backtracking
+
+        self.__king_stack.append(promoted) # Record every call so the matching demote only undoes its own promotion
 
 
     def demote(self, x, y) -> None: # Check and demote a king as necessary during backtracking
-        if self.__king_stack and (x,y) == self.__king_stack[-1] and ((-2 == self.__board[y][x] and 7 == y) or (2 == self.__board[y][x] and 0 == y)):
-            self.__king_stack.pop()
+        if self.__king_stack.pop():
+            if 2 == self.__board[y][x]:
+                self.__num_black += 1
+                self.__num_black_king -= 1
+            else:
+                self.__num_white += 1
+                self.__num_white_king -= 1
+
+            self.__key ^= ZOBRIST[y][x][self.__board[y][x]] ^ ZOBRIST[y][x][self.__board[y][x] // 2]
             self.__board[y][x] //= 2
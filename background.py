@@ -0,0 +1,140 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from ai import AI
+from transposition import position_key
+
+class BackgroundSearch:
+    # Static Variables
+    max_ponder_moves = 8 # Opponent replies searched ahead while pondering, most likely first
+
+    def __init__(self, ai: AI) -> None:
+        self.__ai = ai
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-search")
+        self.__future = None
+
+        # Pondering state, shared with the worker thread under the lock
+        self.__lock = threading.Lock()
+        self.__ponder_future = None
+        self.__pondered = {} # Zobrist key of a position after an opponent reply -> the AI's move
+        self.__pondering = None # Key being searched right now
+        self.__wanted = None # Key the caller is waiting for; pondering ends once it is searched
+        self.__ponder_stop = False
+
+
+    def start(self, board, color: int, time_limit: int | None = None) -> Future: # Sync the AI with the board and search on the worker thread (or reuse a pondered result)
+        self.cancel_search() # Only one search at a time
+
+        rows = [[board.get_piece(x, y) for x in range(8)] for y in range(8)] # Read on the caller's thread so the board is never read while it changes
+        self.__future = self.finish_pondering(position_key(rows, color))
+        if self.__future is not None: # Guessed right - the move is ready or about to be
+            return self.__future
+
+        self.__ai.set_board(rows)
+        self.__ai.resume()
+        self.__future = self.__executor.submit(self.__ai.get_best_move, color, 0, time_limit)
+        return self.__future
+
+
+    def ponder(self, board, color: int, time_limit: int | None = None) -> None: # While `color` (the opponent) thinks, search the AI's reply to its likely moves
+        self.cancel()
+        rows = [[board.get_piece(x, y) for x in range(8)] for y in range(8)]
+        with self.__lock:
+            self.__pondered = {}
+            self.__pondering = self.__wanted = None
+            self.__ponder_stop = False
+
+        self.__ai.resume()
+        self.__ponder_future = self.__executor.submit(self.__ponder, rows, color, time_limit)
+
+
+    def __ponder(self, rows: list[list[int]], color: int, time_limit: int | None) -> None: # Worker thread: search the AI's move after each likely opponent reply
+        ai = self.__ai
+        ai.set_board(rows)
+
+        # Guess the likely replies with the static evaluation from the opponent's side
+        replies = []
+        for move in ai.root_moves(color):
+            ai.make_move(move)
+            replies.append((ai.evaluate(-color) * color, ai.get_board(), ai.get_key(-color)))
+            ai.undo_move()
+        replies.sort(key=lambda reply: reply[0], reverse=True)
+
+        for _, board, key in replies[:self.max_ponder_moves]:
+            with self.__lock:
+                if self.__ponder_stop:
+                    return
+                self.__pondering = key
+
+            ai.set_board(board)
+            move = ai.get_best_move(-color, 0, time_limit)
+
+            with self.__lock:
+                self.__pondering = None
+                if self.__ponder_stop: # Stopped part way - the move may be from an unfinished search
+                    return
+                self.__pondered[key] = move
+                if self.__wanted == key:
+                    return
+
+
+    def finish_pondering(self, key: int) -> Future | None: # End pondering; return a future of the AI's move if the position with this key was pondered
+        if self.__ponder_future is None:
+            return None
+
+        with self.__lock:
+            if key in self.__pondered: # Already searched
+                move = Future()
+                move.set_result(self.__pondered[key])
+
+            elif self.__pondering == key: # Being searched right now - pondering ends when that search finishes
+                self.__wanted = key
+                move = Future()
+                self.__ponder_future.add_done_callback(lambda ponder: move.cancelled() or move.set_result(self.__pondered.get(key)))
+                return move
+
+            else: # Wrong guess
+                move = None
+
+        self.stop_pondering()
+        return move
+
+
+    def stop_pondering(self) -> None: # Stop pondering and wait for the worker to become idle
+        if self.__ponder_future is not None:
+            with self.__lock:
+                self.__ponder_stop = True
+                self.__ai.stop()
+
+            self.__ponder_future.exception() # Wait for it to return
+            self.__ponder_future = None
+
+
+    def searching(self) -> bool: # Check if a search was started and its result has not been collected
+        return self.__future is not None
+
+
+    def done(self) -> bool: # Check if the running search has finished
+        return self.__future is not None and self.__future.done()
+
+
+    def result(self) -> float | tuple | None: # Collect the finished search's move (blocks if it is still running)
+        future, self.__future = self.__future, None
+        return future.result() if future else None
+
+
+    def cancel_search(self) -> None: # Stop the running search and wait for the worker to become idle
+        if self.__future is not None:
+            if not self.__future.cancel(): # Already running - ask the search to bail out
+                self.__ai.stop()
+                self.__future.exception() # Wait for it to return
+            self.__future = None
+
+
+    def cancel(self) -> None: # Stop searching and pondering
+        self.cancel_search()
+        self.stop_pondering()
+
+
+    def shutdown(self) -> None: # Cancel any search and stop the worker thread
+        self.cancel()
+        self.__executor.shutdown(wait=True)
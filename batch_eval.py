@@ -0,0 +1,135 @@
+import numpy as np
+from ai import AI
+from checker import DARK_SQUARES
+
+# Board regions used by the evaluation terms (the same squares AI.track counts)
+CENTER = np.zeros((8, 8), dtype=bool)
+CENTER[3:5, 2:6] = True # Rows 3-4, columns 2-5
+BLACK_NEAR = np.zeros((8, 8), dtype=bool)
+BLACK_NEAR[1:3] = True # Rows 1-2, two rows before black's last row
+WHITE_NEAR = np.zeros((8, 8), dtype=bool)
+WHITE_NEAR[5:7] = True # Rows 5-6, two rows before white's last row
+
+DARK_ROWS = np.array([y for _, y in DARK_SQUARES])
+DARK_COLUMNS = np.array([x for x, _ in DARK_SQUARES])
+
+
+def to_array(boards) -> np.ndarray: # Stack boards given as N x 8 x 8 rows or N x 32 dark squares (DARK_SQUARES order) into an N x 8 x 8 int8 array
+    array = np.asarray(boards, dtype=np.int8)
+    if 2 == array.ndim and 32 == array.shape[1]:
+        full = np.zeros((len(array), 8, 8), dtype=np.int8)
+        full[:, DARK_ROWS, DARK_COLUMNS] = array
+        array = full
+
+    if 3 != array.ndim or (8, 8) != array.shape[1:]:
+        raise ValueError(f"expected N x 8 x 8 or N x 32 boards, got shape {array.shape}")
+
+    return array
+
+
+def move_counts(boards, colors) -> tuple[np.ndarray, np.ndarray]: # Count captures and (when there are none) simple moves for the side to move of every board
+    ai = AI(table_size=0)
+    captures = np.zeros(len(boards), dtype=np.int32)
+    moves = np.zeros(len(boards), dtype=np.int32)
+    for idx, (board, color) in enumerate(zip(to_array(boards).tolist(), np.asarray(colors).tolist())):
+        ai.set_board(board)
+        captures[idx] = len(ai.possible_captures(color))
+        if not captures[idx]:
+            moves[idx] = len(ai.possible_moves(color))
+
+    return captures, moves
+
+
+def evaluate_batch(boards, colors, captures=None, moves=None, noise: bool | None = None, weights: dict | None = None) -> np.ndarray: # AI.evaluate for every board at once (with AI.weights updated by weights); pass the move counts if the caller already has them
+    boards = to_array(boards)
+    colors = np.broadcast_to(np.asarray(colors, dtype=np.int8), (len(boards),))
+    if captures is None or moves is None:
+        captures, moves = move_counts(boards, colors)
+    captures = np.asarray(captures)
+    moves = np.asarray(moves)
+    weights = {**AI.weights, **(weights or {})}
+
+    # Count difference in pieces; give extra weight to difference in number of kings
+    piece_diff = (weights["man"] * (np.count_nonzero(boards == 1, axis=(1, 2)) - np.count_nonzero(boards == -1, axis=(1, 2)))
+                  + weights["king"] * (np.count_nonzero(boards == 2, axis=(1, 2)) - np.count_nonzero(boards == -2, axis=(1, 2))))
+
+    # Mobility from the move counts; no moves or captures loses the game
+    with np.errstate(invalid="ignore"):
+        pos_moves_eval = np.where(captures > 0, captures * weights["capture"] * colors,
+                                  np.where(moves > 0, moves * weights["mobility"] * colors, np.where(colors == -1, np.inf, -np.inf)))
+
+    # Central control and the opponent's proximity to promotion
+    central_control_eval = (boards * CENTER).sum(axis=(1, 2)) * weights["center"]
+    black_near = np.count_nonzero((boards == 1) & BLACK_NEAR, axis=(1, 2))
+    white_near = np.count_nonzero((boards == -1) & WHITE_NEAR, axis=(1, 2))
+    promotion_proximity_eval = np.where(colors == -1, black_near, -white_near) * weights["promotion"]
+
+    # Added in the same order as AI.evaluate so the results are identical
+    evaluation = piece_diff + pos_moves_eval + central_control_eval + promotion_proximity_eval
+    if AI.noise if noise is None else noise:
+        evaluation += np.random.randint(-50, 51, size=len(boards)) / 715
+
+    return evaluation
+
+
+def features_batch(boards, colors, captures=None, moves=None) -> np.ndarray: # The evaluation terms of every board, one float32 column per AI.weights entry; AI.evaluate is their dot product with the weights
+    boards = to_array(boards)
+    colors = np.broadcast_to(np.asarray(colors, dtype=np.int8), (len(boards),))
+    if captures is None or moves is None:
+        captures, moves = move_counts(boards, colors)
+    captures = np.asarray(captures)
+    moves = np.asarray(moves)
+
+    columns = {"man": np.count_nonzero(boards == 1, axis=(1, 2)) - np.count_nonzero(boards == -1, axis=(1, 2)),
+               "king": np.count_nonzero(boards == 2, axis=(1, 2)) - np.count_nonzero(boards == -2, axis=(1, 2)),
+               "capture": captures * colors,
+               "mobility": np.where(captures > 0, 0, moves * colors), # Boards without moves are lost; evaluate gives them infinite scores instead
+               "center": (boards * CENTER).sum(axis=(1, 2)),
+               "promotion": np.where(colors == -1, np.count_nonzero((boards == 1) & BLACK_NEAR, axis=(1, 2)),
+                                     -np.count_nonzero((boards == -1) & WHITE_NEAR, axis=(1, 2)))}
+
+    return np.stack([columns[name] for name in AI.weights], axis=1).astype(np.float32)
+
+
+def frontier_search(ai: AI, color: int, plies: int | None = None) -> float | tuple: # Minimax like AI(alpha_beta=False), but the leaves are collected first and evaluated in one batch
+    plies = ai.max_depth + 1 if plies is None else plies
+    boards, colors, captures, moves = [], [], [], []
+
+    def expand(color: int, plies: int): # Return a leaf index, a terminal evaluation or a list of (move, child)
+        legal_captures = ai.possible_captures(color)
+        legal = legal_captures or ai.possible_moves(color)
+        # Plies run negative while forced captures are followed past the horizon (the AI.horizon quiescence rule)
+        if plies <= 0 and not (ai.quiescence and legal_captures and -plies < ai.max_quiescence):
+            boards.append(ai.get_board())
+            colors.append(color)
+            captures.append(len(legal_captures))
+            moves.append(0 if legal_captures else len(legal))
+            return len(boards) - 1
+
+        if not legal: # The side to move loses
+            return float("inf") if color == -1 else float("-inf")
+
+        children = []
+        for move in legal:
+            ai.make_move(move)
+            children.append((move, expand(-color, plies - 1)))
+            ai.undo_move()
+        return children
+
+    tree = expand(color, plies)
+    values = evaluate_batch(boards, colors, captures, moves, noise=ai.noise, weights=ai.get_weights()).tolist() if boards else []
+
+    def backup(node, color: int, root: bool = False): # Minimax the leaf values up the tree (the later of equal moves wins, like backtrack)
+        if isinstance(node, int):
+            return values[node]
+        if isinstance(node, float):
+            return node
+
+        best_move = best_eval = float("inf") if color == -1 else float("-inf")
+        for move, child in node:
+            move_eval = backup(child, -color)
+            if move_eval <= best_eval if color == -1 else move_eval >= best_eval:
+                best_move, best_eval = move, move_eval
+        return best_move if root else best_eval
+
+    return backup(tree, color, True)
@@ -0,0 +1,213 @@
+import os
+import sys
+import json
+import time
+import argparse
+from ai import AI
+from checker import DARK_SQUARES
+
+# Benchmark positions: (board rows, side to move)
+POSITIONS = {
+    "initial": ([[0,-1,0,-1,0,-1,0,-1],
+                 [-1,0,-1,0,-1,0,-1,0],
+                 [0,-1,0,-1,0,-1,0,-1],
+                 [0,0,0,0,0,0,0,0],
+                 [0,0,0,0,0,0,0,0],
+                 [1,0,1,0,1,0,1,0],
+                 [0,1,0,1,0,1,0,1],
+                 [1,0,1,0,1,0,1,0]], 1),
+    "opening": ([[0,-1,0,-1,0,-1,0,-1],
+                 [-1,0,0,0,-1,0,-1,0],
+                 [0,0,0,-1,0,0,0,1],
+                 [0,0,0,0,1,0,0,0],
+                 [0,1,0,0,0,0,0,0],
+                 [0,0,0,0,0,0,0,0],
+                 [0,1,0,0,0,1,0,1],
+                 [1,0,1,0,1,0,1,0]], 1),
+    "midgame": ([[0,-1,0,-1,0,-1,0,-1],
+                 [0,0,-1,0,0,0,0,0],
+                 [0,-1,0,0,0,0,0,0],
+                 [0,0,-1,0,0,0,-1,0],
+                 [0,1,0,1,0,0,0,0],
+                 [1,0,1,0,1,0,0,0],
+                 [0,0,0,0,0,0,0,-1],
+                 [1,0,1,0,0,0,1,0]], 1),
+    "kings": ([[0,0,0,0,0,0,0,0],
+               [0,0,-2,0,0,0,0,0],
+               [0,0,0,0,0,-1,0,0],
+               [0,0,0,0,0,0,0,0],
+               [0,0,0,2,0,0,0,0],
+               [0,0,1,0,0,0,0,0],
+               [0,0,0,0,0,0,0,-2],
+               [0,0,0,0,2,0,0,0]], 1),
+}
+
+# Known leaf counts for depths 1, 2, ...; any difference means move generation or make/undo changed behaviour
+PERFT = {
+    "initial": [7, 49, 302, 1469, 7361, 36768, 179740],
+    "opening": [1, 2, 18, 97, 775, 4518, 33605],
+    "midgame": [1, 1, 1, 11, 89, 590, 3812],
+    "kings": [6, 41, 272, 1718, 10123, 59270, 359589],
+}
+
+
+def perft(ai: AI, color: int, depth: int) -> int: # Count the leaf nodes of the move tree to the given depth
+    if not depth:
+        return 1
+
+    moves = ai.possible_captures(color)
+    if not moves:
+        moves = ai.possible_moves(color)
+    if 1 == depth:
+        return len(moves)
+
+    nodes = 0
+    for move in moves:
+        ai.make_move(move)
+        nodes += perft(ai, -color, depth - 1)
+        ai.undo_move()
+
+    return nodes
+
+
+def load(name: str) -> tuple: # Return an AI set up with a benchmark position and the side to move
+    board, color = POSITIONS[name]
+    ai = AI()
+    ai.set_board(board)
+    return ai, color
+
+
+def bench_perft(max_depth: int) -> list[dict]: # Run perft on every position, checking the counts against PERFT
+    results = []
+    for name in POSITIONS:
+        ai, color = load(name)
+        for depth in range(1, max_depth + 1):
+            start = time.perf_counter()
+            nodes = perft(ai, color, depth)
+            seconds = time.perf_counter() - start
+
+            expected = PERFT[name][depth - 1] if depth <= len(PERFT[name]) else None
+            results.append({"position": name,
+                            "depth": depth,
+                            "nodes": nodes,
+                            "expected": expected,
+                            "ok": expected is None or expected == nodes,
+                            "seconds": seconds,
+                            "nodes_per_second": nodes / seconds if seconds else 0.0})
+
+    return results
+
+
+def bench_search(depths: list[int]) -> list[dict]: # Time get_best_move on every position at several depths
+    results = []
+    saved_depth = AI.max_depth
+    try:
+        for name in POSITIONS:
+            for depth in depths:
+                AI.max_depth = depth
+                ai, color = load(name)
+                start = time.perf_counter()
+                move = ai.get_best_move(color, 0)
+                seconds = time.perf_counter() - start
+
+                results.append({"position": name,
+                                "max_depth": depth,
+                                "move": move if isinstance(move, tuple) else None,
+                                "nodes": ai.get_nodes(),
+                                "seconds": seconds,
+                                "nodes_per_second": ai.get_nodes() / seconds if seconds else 0.0})
+    finally:
+        AI.max_depth = saved_depth
+
+    return results
+
+
+def bench_calls(name: str, call, repeat: int) -> dict: # Time a function call repeated many times
+    start = time.perf_counter()
+    for _ in range(repeat):
+        call()
+    seconds = time.perf_counter() - start
+
+    return {"function": name,
+            "calls": repeat,
+            "seconds": seconds,
+            "calls_per_second": repeat / seconds if seconds else 0.0,
+            "microseconds_per_call": 1e6 * seconds / repeat}
+
+
+def bench_micro(repeat: int) -> list[dict]: # Micro-benchmark evaluate and capturable on every position
+    results = []
+    for name in POSITIONS:
+        ai, color = load(name)
+        board = ai.get_board()
+        pieces = [(x, y) for y in range(8) for x in range(8) if board[y][x] * color > 0]
+
+        result = bench_calls("evaluate", lambda: ai.evaluate(color), repeat)
+        result["position"] = name
+        results.append(result)
+
+        result = bench_calls("capturable", lambda: [ai.capturable(x, y, color, 1) for x, y in pieces], repeat)
+        result["position"] = name
+        result["pieces"] = len(pieces)
+        results.append(result)
+
+    return results
+
+
+def bench_render(frames: int) -> list[dict]: # Time full board redraws on a board full of kings, drawing primitives every frame vs blitting cached sprites
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1") # Keep pygame's banner out of the JSON report
+    import pygame # Only the render benchmark needs pygame; the engine benchmarks stay headless
+    from board import Board
+
+    board = Board()
+    board.set_board([[(2 if y < 4 else -2) if (x, y) in DARK_SQUARES else 0 for x in range(8)] for y in range(8)])
+    surface = pygame.Surface((Board.board_size * Board.sqr_size, Board.board_size * Board.sqr_size))
+
+    results = []
+    saved = Board.use_sprites
+    try:
+        for use_sprites in (False, True):
+            Board.use_sprites = use_sprites
+            board.invalidate()
+            board.draw(surface) # Fill the sprite cache outside the timing
+
+            def frame() -> None:
+                board.invalidate()
+                board.draw(surface)
+
+            result = bench_calls("Board.draw", frame, frames)
+            result["sprites"] = use_sprites
+            result["milliseconds_per_frame"] = result.pop("microseconds_per_call") / 1000
+            results.append(result)
+    finally:
+        Board.use_sprites = saved
+
+    results[1]["speedup"] = results[0]["seconds"] / results[1]["seconds"] if results[1]["seconds"] else 0.0
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Engine benchmarks: perft, search timing and evaluate/capturable micro-benchmarks (JSON output)")
+    parser.add_argument("--perft-depth", type=int, default=5, help="deepest perft depth")
+    parser.add_argument("--search-depths", type=int, nargs="*", default=[3, 4, 5], help="AI.max_depth values to time get_best_move with")
+    parser.add_argument("--repeat", type=int, default=2000, help="calls per micro-benchmark")
+    parser.add_argument("--render-frames", type=int, default=500, help="frames per render benchmark (0 skips it)")
+    parser.add_argument("--output", default=None, help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    AI.noise = False # Keep search results reproducible between runs
+    report = {"perft": bench_perft(args.perft_depth),
+              "search": bench_search(args.search_depths),
+              "micro": bench_micro(args.repeat)}
+    if args.render_frames:
+        report["render"] = bench_render(args.render_frames)
+    report["ok"] = all(result["ok"] for result in report["perft"])
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    sys.exit(0 if report["ok"] else 1)
@@ -0,0 +1,305 @@
+from random import randrange
+from collections import defaultdict
+from ai import AI
+
+# Squares are the 32 dark squares numbered row by row: square = 4 * y + x // 2
+# A position is three 32 bit masks: black pieces, white pieces and kings (of either color)
+SQUARES = [(2 * (s % 4) + (1 - (s // 4) % 2), s // 4) for s in range(32)] # Square -> (x, y)
+ALL = (1 << 32) - 1
+
+EVEN_ROWS = sum(0xF << (4 * y) for y in range(0, 8, 2))
+ODD_ROWS = sum(0xF << (4 * y) for y in range(1, 8, 2))
+LEFT_EDGE = sum(1 << s for s in range(32) if 0 == SQUARES[s][0])
+RIGHT_EDGE = sum(1 << s for s in range(32) if 7 == SQUARES[s][0])
+TOP_ROW = 0xF
+BOTTOM_ROW = 0xF << 28
+
+CENTER = sum(1 << s for s in range(32) if SQUARES[s][1] in (3, 4) and 2 <= SQUARES[s][0] < 6) # Rows 3-4, columns 2-5
+NEAR_TOP = sum(1 << s for s in range(32) if SQUARES[s][1] in (1, 2)) # Where black men are close to promoting
+NEAR_BOTTOM = sum(1 << s for s in range(32) if SQUARES[s][1] in (5, 6)) # Where white men are close to promoting
+
+# Directions as (dx, dy); each has a shift for squares on even and odd rows and a mask of squares it can start from
+UP_RIGHT, UP_LEFT, DOWN_RIGHT, DOWN_LEFT = range(4)
+SHIFTS = [(-3, -4), (-4, -5), (5, 4), (4, 3)]
+SOURCES = [ALL & ~TOP_ROW & ~RIGHT_EDGE,
+           ALL & ~TOP_ROW & ~LEFT_EDGE,
+           ALL & ~BOTTOM_ROW & ~RIGHT_EDGE,
+           ALL & ~BOTTOM_ROW & ~LEFT_EDGE]
+
+# Direction order used by AI.get_legal: forward right, forward left, then backward right, backward left (kings only)
+DIRECTIONS = {1: (UP_RIGHT, UP_LEFT, DOWN_RIGHT, DOWN_LEFT),
+              -1: (DOWN_RIGHT, DOWN_LEFT, UP_RIGHT, UP_LEFT)}
+
+
+def shift(bb: int, shift_amount: int) -> int: # Shift a mask left (positive) or right (negative)
+    return (bb << shift_amount) & ALL if shift_amount > 0 else bb >> -shift_amount
+
+
+def step(bb: int, direction: int) -> int: # Move every square of the mask one step in the given direction (squares leaving the board vanish)
+    bb &= SOURCES[direction]
+    even_shift, odd_shift = SHIFTS[direction]
+    return shift(bb & EVEN_ROWS, even_shift) | shift(bb & ODD_ROWS, odd_shift)
+
+
+def from_rows(board: list[list[int]]) -> tuple: # Convert an 8x8 board (1/-1 men, 2/-2 kings) to (black, white, kings) masks
+    black = white = kings = 0
+    for s, (x, y) in enumerate(SQUARES):
+        piece = board[y][x]
+        if piece > 0:
+            black |= 1 << s
+        elif piece < 0:
+            white |= 1 << s
+        if 2 == piece or -2 == piece:
+            kings |= 1 << s
+
+    return black, white, kings
+
+
+class BitboardAI():
+    # Static Variables
+    max_depth = None # Search depth; None follows AI.max_depth at search time (set it on an instance to search a different depth)
+
+    def __init__(self, weights: dict | None = None) -> None: # weights overrides AI.weights like AI(weights=...)
+        unknown = set(weights or {}) - set(AI.weights)
+        if unknown:
+            raise ValueError(f"unknown evaluation weights: {', '.join(sorted(unknown))}")
+        self.__weights = {**AI.weights, **(weights or {})}
+
+        self.__black = 0xFFF << 20
+        self.__white = 0xFFF
+        self.__kings = 0
+
+        self.__nodes = 0
+        self.__killers = defaultdict(list)
+
+
+    def update_move(self, board) -> None: # Update the AI's copy of the board (same interface as AI.update_move)
+        self.__black, self.__white, self.__kings = from_rows([[board.get_piece(x, y) for x in range(8)] for y in range(8)])
+
+
+    def get_position(self) -> tuple: # Return the (black, white, kings) masks
+        return self.__black, self.__white, self.__kings
+
+
+    def set_position(self, position: tuple) -> None: # Set the (black, white, kings) masks
+        self.__black, self.__white, self.__kings = position
+
+
+    def get_nodes(self) -> int: # Return number of nodes visited by the last search
+        return self.__nodes
+
+
+    def possible_captures(self, color: int, position: tuple | None = None) -> list[tuple]: # Capture chains of the side to move, in AI.possible_captures order
+        black, white, kings = position or (self.__black, self.__white, self.__kings)
+        own, enemy = (black, white) if 1 == color else (white, black)
+        promotion_row = TOP_ROW if 1 == color else BOTTOM_ROW
+
+        # Squares holding own pieces that have an enemy next to them with an empty square behind (in any direction; direction ^ 3 is the opposite one)
+        empty = ALL & ~(black | white)
+        candidates = 0
+        for direction in range(4):
+            candidates |= step(step(empty, direction ^ 3) & enemy, direction ^ 3)
+        candidates &= own
+
+        captures = []
+        while candidates:
+            bit = candidates & -candidates
+            candidates ^= bit
+            captures.extend(self.capturable(bit, bool(bit & kings), color, black | white, enemy, promotion_row, 1))
+
+        return captures
+
+
+    def capturable(self, bit: int, king: bool, color: int, occupied: int, enemy: int, promotion_row: int, capture_depth: int) -> list[tuple]: # Capture chains starting from one piece (mirrors AI.capturable)
+        captures = []
+        king = king or bool(bit & promotion_row) # Men reaching the last row continue the chain as kings
+        x, y = SQUARES[bit.bit_length() - 1]
+
+        for direction in DIRECTIONS[color][:4 if king else 2]:
+            target = step(bit, direction)
+            if target & enemy:
+                landing = step(target, direction)
+                if landing and not landing & occupied: # The piece stays on every square it visited while the chain grows, like in AI.capturable
+                    capture_chain = self.capturable(landing, king, color, occupied | landing, enemy, promotion_row, capture_depth + 1)
+                    if capture_chain:
+                        for cap in capture_chain:
+                            captures.append((cap[0], x, y) + cap[1:])
+
+                    else:
+                        landing_x, landing_y = SQUARES[landing.bit_length() - 1]
+                        captures.append((capture_depth, x, y, landing_x, landing_y))
+
+        return captures
+
+
+    def possible_moves(self, color: int, position: tuple | None = None) -> list[tuple]: # Non capturing moves of the side to move, in AI.possible_moves order
+        black, white, kings = position or (self.__black, self.__white, self.__kings)
+        own = black if 1 == color else white
+        empty = ALL & ~(black | white)
+        directions = DIRECTIONS[color]
+
+        # For every direction, the pieces that can step into an empty square
+        movers = [step(empty, direction ^ 3) & own for direction in directions] # direction ^ 3 is the opposite direction
+        movers[2] &= kings
+        movers[3] &= kings
+
+        moves = []
+        pieces = movers[0] | movers[1] | movers[2] | movers[3]
+        while pieces:
+            bit = pieces & -pieces
+            pieces ^= bit
+            x, y = SQUARES[bit.bit_length() - 1]
+            for idx, direction in enumerate(directions):
+                if bit & movers[idx]:
+                    target_x, target_y = SQUARES[step(bit, direction).bit_length() - 1]
+                    moves.append((0, x, y, target_x, target_y))
+
+        return moves
+
+
+    def make_move(self, position: tuple, move: tuple) -> tuple: # Return the position after the move (positions are immutable so no undo is needed)
+        black, white, kings = position
+        start = 1
+        hops = move[0] or 1
+
+        while hops:
+            from_bit = 1 << (4 * move[start + 1] + move[start] // 2)
+            to_bit = 1 << (4 * move[start + 3] + move[start + 2] // 2)
+
+            if move[0]: # Remove the captured piece
+                captured = ~(1 << (2 * (move[start + 1] + move[start + 3]) + (move[start] + move[start + 2]) // 4))
+                black &= captured
+                white &= captured
+                kings &= captured
+
+            if kings & from_bit:
+                kings ^= from_bit | to_bit
+
+            if black & from_bit:
+                black ^= from_bit | to_bit
+                if to_bit & TOP_ROW: # Promote as necessary
+                    kings |= to_bit
+            else:
+                white ^= from_bit | to_bit
+                if to_bit & BOTTOM_ROW:
+                    kings |= to_bit
+
+            hops -= 1
+            start += 2
+
+        return black, white, kings
+
+
+    def get_best_move(self, color: int, depth: int) -> float | tuple: # Return the best move/evaluation of current position
+        position = (self.__black, self.__white, self.__kings)
+        if depth:
+            return self.alpha_beta(position, color, depth, float("-inf"), float("inf"))
+
+        self.__nodes = 1
+        moves = self.possible_captures(color, position) or self.possible_moves(color, position)
+        best_move = best_eval = float("inf") if color == -1 else float("-inf")
+        if not moves:
+            return best_eval
+
+        # Same root procedure as AI.search_root so both engines pick the same move
+        indices = {move: idx for idx, move in enumerate(moves)}
+        best_idx = -1
+        for move in self.order_moves(moves, color, 0, position):
+            if 1 == color:
+                alpha, beta = best_eval - AI.window, float("inf")
+            else:
+                alpha, beta = float("-inf"), best_eval + AI.window
+
+            move_eval = self.alpha_beta(self.make_move(position, move), -color, 1, alpha, beta)
+            idx = indices[move]
+            if move_eval == best_eval and idx > best_idx or (move_eval < best_eval if color == -1 else move_eval > best_eval):
+                best_move, best_eval, best_idx = move, move_eval, idx
+
+        return best_move
+
+
+    def order_moves(self, moves: list[tuple], color: int, depth: int, position: tuple) -> list[tuple]: # Longer chains, promotions and killer moves first
+        killers = self.__killers[depth]
+        men = (position[0] if 1 == color else position[1]) & ~position[2]
+        promotion_row = 0 if 1 == color else 7
+
+        def priority(move: tuple) -> int:
+            score = move[0]
+            if men >> (4 * move[2] + move[1] // 2) & 1 and move[-1] == promotion_row:
+                score += 10
+            if move in killers:
+                score += 20
+            return score
+
+        return sorted(moves, key=priority, reverse=True)
+
+
+    def alpha_beta(self, position: tuple, color: int, depth: int, alpha: float, beta: float) -> float: # Fail-soft alpha-beta search returning the evaluation of the position
+        self.__nodes += 1
+        moves = self.possible_captures(color, position)
+
+        # Past max_depth only forced captures are followed (AI.quiescence, the same rule as AI.horizon)
+        max_depth = AI.max_depth if self.max_depth is None else self.max_depth
+        if depth > max_depth and not (AI.quiescence and moves and depth <= max_depth + AI.max_quiescence):
+            return self.evaluate(color, position, moves)
+
+        if not moves:
+            moves = self.possible_moves(color, position)
+            if not moves: # No moves or captures - the side to move loses
+                return float("inf") if color == -1 else float("-inf")
+
+        best_eval = float("inf") if color == -1 else float("-inf")
+        for move in self.order_moves(moves, color, depth, position):
+            move_eval = self.alpha_beta(self.make_move(position, move), -color, depth + 1, alpha, beta)
+
+            if 1 == color:
+                if move_eval > best_eval:
+                    best_eval = move_eval
+                    alpha = max(alpha, best_eval)
+
+            else:
+                if move_eval < best_eval:
+                    best_eval = move_eval
+                    beta = min(beta, best_eval)
+
+            if alpha >= beta:
+                killers = self.__killers[depth]
+                if move not in killers:
+                    killers.insert(0, move)
+                    del killers[2:]
+                break
+
+        return best_eval
+
+
+    def evaluate(self, color: int, position: tuple | None = None, captures: list[tuple] | None = None) -> float: # Same evaluation as AI.evaluate (AI.noise is read on every call), computed with population counts
+        weights = self.__weights
+        black, white, kings = position or (self.__black, self.__white, self.__kings)
+        black_kings = black & kings
+        white_kings = white & kings
+        black_men = black ^ black_kings
+        white_men = white ^ white_kings
+
+        piece_diff = weights["man"] * (black_men.bit_count() - white_men.bit_count()) + weights["king"] * (black_kings.bit_count() - white_kings.bit_count())
+
+        pos_moves_eval = 0
+        pos_moves = self.possible_captures(color, position) if captures is None else captures
+        if pos_moves:
+            pos_moves_eval = len(pos_moves) * weights["capture"] * color
+
+        else:
+            pos_moves = self.possible_moves(color, position)
+            if not pos_moves:
+                pos_moves_eval = float("inf") if color == -1 else float("-inf")
+
+            else:
+                pos_moves_eval = len(pos_moves) * weights["mobility"] * color
+
+        central_control_eval = ((black & CENTER).bit_count() + (black_kings & CENTER).bit_count() - (white & CENTER).bit_count() - (white_kings & CENTER).bit_count()) * weights["center"]
+
+        promotion_proximity_eval = (-color * ((black_men & NEAR_TOP) if -1 == color else (white_men & NEAR_BOTTOM)).bit_count()) * weights["promotion"]
+
+        evaluation = piece_diff + pos_moves_eval + central_control_eval + promotion_proximity_eval
+        if AI.noise:
+            evaluation += randrange(-50, 51) / 715
+        return evaluation
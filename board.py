@@ -1,18 +1,20 @@
 import pygame
 from collections import defaultdict
-from checker import Checker
+from rules import Rules
+from checker import DARK_SQUARES
 
-class Board:
+pygame.font.init()
+STAT_FONT = pygame.font.SysFont("comicsans", 30)
+
+class Board(Rules):
     # Static Variables
-    sqr_size = 80
     dark = (118,150,86)
     light = (238,238,210)
-    black = (0,0,0)
-    white = (255,255,255)
     highlight = (192,192,192)
-    board_size = 8
-    dark_squares = []
+    king_letter = (255,0,0)
     radius = 25
+    offset = 40
+    use_sprites = True # Blit squares from the sprite cache (False draws the circles and text every time)
     
     colors = [(255,0,0),
                 (0,255,0),
@@ -23,254 +25,97 @@ class Board:
                 ]
     
     def __init__(self) -> None:
-        self.__capture_highlight = True
-        self.__last_capture = 0
-        self.__num_white = 12
-        self.__num_black = 12
-        
-        self.__moves = []
-        self.__capture_moves = defaultdict(list)
-        self.__capture = False
-        self.__selection = ()
-
-        self.__board = [[0,-1,0,-1,0,-1,0,-1],
-                      [-1,0,-1,0,-1,0,-1,0],
-                      [0,-1,0,-1,0,-1,0,-1],
-                      [0,0,0,0,0,0,0,0],
-                      [0,0,0,0,0,0,0,0],
-                      [1,0,1,0,1,0,1,0],
-                      [0,1,0,1,0,1,0,1],
-                      [1,0,1,0,1,0,1,0]]
-        
-        # Store the checkers' positions in a dictionary for easy retrieval
-        self.__mapping = defaultdict(Checker)
-        for i in range(8):
-            for j in range(8):
-                if -1 == self.__board[j][i]:
-                    self.__mapping[(i,j)] = Checker(i, j, self.white)
-                elif 1 == self.__board[j][i]:
-                    self.__mapping[(i,j)] = Checker(i, j, self.black)
-
-        # Store the dark colored squares in a list for drawing
-        for i in range(4):
-            for j in range(4):
-                self.dark_squares.append((2 * i * self.sqr_size, (2 * j + 1) * self.sqr_size, self.sqr_size, self.sqr_size))
-                self.dark_squares.append(((2 * i + 1) * self.sqr_size, 2 * j * self.sqr_size, self.sqr_size, self.sqr_size))
-
-
-    def draw(self, WIN: pygame.Surface) -> None: # Draw board, pieces and move highlighting
-        WIN.fill(self.light)
-        
-        for square in self.dark_squares: # Draw board
-            pygame.draw.rect(WIN, self.dark, square)
-
-        # Draw pieces
-        for i in range(8):
-            for j in range(8):
-                if self.__board[i][j]:
-                    self.__mapping[(j,i)].draw(WIN)
-
-        # Draw capture/move highlighting
-        idx = 0
-        if not self.__selection and self.__capture and self.__capture_highlight:
-            for capturer in self.__capture_moves.keys():
-                for pos in self.__capture_moves[capturer]:
-                    pygame.draw.circle(WIN, self.colors[idx], ((capturer[0] * 80 + 40), (capturer[1] * 80 + 40)), self.radius - 10)
-                    pygame.draw.circle(WIN, self.colors[idx], ((pos[0] * 80 + 40), (pos[1] * 80 + 40)), self.radius)
-                
-                idx += 1
-
-        else:
-            for move in self.__moves:
-                pygame.draw.circle(WIN, self.highlight, ((move[0] * 80 + 40), (move[1] * 80 + 40)), self.radius)
-
-
-    def pos_to_idx(self, x: int, y: int) -> tuple: # Convert position on board to indices
-        return (x // self.sqr_size, y // self.sqr_size)
-    
-
-    def get_color(self, x: int, y: int) -> int: # Get the integer code for the checker's color
-        x_idx, y_idx = self.pos_to_idx(x, y)
-        if (x_idx, y_idx) in self.__mapping:
-            return self.__mapping[(x_idx, y_idx)].get_color()
-        return -1
-    
-
-    def get_legal(self, x: int, y: int) -> None: # Return all legal moves of a checker
-        x_idx, y_idx = self.pos_to_idx(x, y)
-        self.__selection = (x_idx, y_idx)
-
-        # If a checker can be captured, only include those moves (forced capturing)
-        if self.__capture:
-            for move in self.__capture_moves[self.__selection]:
-                self.__moves.append(move)
-            if 0 == len(self.__moves):
-                self.__selection = ()
-        
-        # Any move if capturing is not forced
-        else:        
-            legal_moves = self.__mapping[self.__selection].get_legal()
-            for move in legal_moves:
-                if move not in self.__mapping:
-                    self.__moves.append(move)
+        super().__init__()
+        self.__drawn = {} # (x, y) -> (piece, highlight markers) last drawn on each dark square
+        self.__surface = None # Surface the squares were last drawn on
+        self.__sprites = {} # (piece, highlight markers) -> pre-rendered dark square
+        self.__sprite_size = None # (sqr_size, radius, offset) the sprites were rendered at
 
 
-    def clear_highlight(self) -> None: # Clear move highlighting
-        self.__moves.clear()
-        self.__selection = ()
-        self.__capture_highlight = True
+    def invalidate(self) -> None: # Redraw the whole board on the next draw (e.g. after something else was drawn over it)
+        self.__drawn.clear()
 
 
-    def toggle_capture_highlight(self) -> None: # Toggle between highlighting possible captures
-        self.__capture_highlight = not self.__capture_highlight
-        self.clear_highlight()
+    def square_states(self) -> dict: # Return what every dark square should show: ((piece id, color) or None, highlight markers)
+        pieces = {piece.get_pos(): piece for piece in self.get_pieces()}
+        markers = defaultdict(list) # (x, y) -> [(color, radius)] in drawing order
 
-
-    def in_legal(self, x: int, y: int) -> bool: # Check if user's move is valid
-        return self.pos_to_idx(x, y) in self.__moves
-    
-
-    def movable(self, piece: Checker) -> bool: # Check if a move is valid
-        ret_val = False
-        moves = piece.get_legal()
+        # Capture/move highlighting
+        capture_moves, moves = self.get_highlights()
+        for idx, capturer in enumerate(capture_moves.keys()):
+            for pos in capture_moves[capturer]:
+                markers[capturer].append((self.colors[idx], self.radius - 10))
+                markers[pos].append((self.colors[idx], self.radius))
 
         for move in moves:
-            if move not in self.__mapping:
-                ret_val = True
-                break
-
-        return ret_val
-                    
+            markers[move].append((self.highlight, self.radius))
 
-    def can_move(self, color: int) -> bool: # Loop through user's checkers and check for possible moves
-        ret_val = False
-        for piece in self.__mapping.values():
-            if piece.get_color() == color and self.movable(piece):
-                ret_val = True
-                break
+        states = {}
+        for pos in DARK_SQUARES:
+            piece = pieces.get(pos)
+            states[pos] = ((piece.get_id(), piece.get_color()) if piece else None, tuple(markers.get(pos, ())))
 
-        return ret_val
-    
-
-    def move(self, x: int, y: int) -> None: # Execute user's move
-        # Set piece's current position to zero
-        piece = self.__mapping[self.__selection]
-        cur_pos = piece.get_pos()
-        self.__board[cur_pos[1]][cur_pos[0]] = 0
+        return states
 
-        # Move piece to new square and update position dictionary
-        piece.move(self.pos_to_idx(x, y))
-        self.__mapping.pop(self.__selection, None)
-        piece = piece.convert()
-        cur_pos = piece.get_pos()
-        self.__mapping[cur_pos] = piece
 
-        self.__board[cur_pos[1]][cur_pos[0]] = 1 if piece.get_color() else -1
-        self.__last_capture += 1
+    def draw(self, WIN: pygame.Surface) -> list[pygame.Rect]: # Redraw the squares that changed since the last frame; return the rects to pass to pygame.display.update
+        full = WIN is not self.__surface or not self.__drawn
+        if full:
+            WIN.fill(self.light)
+            self.__drawn.clear()
+            self.__surface = WIN
 
-    
-    def capturable(self, piece: Checker) -> bool: # Check for possible captures by a checker and add them to a list
-        ret_val = False
-        x_idx, y_idx = piece.get_pos()
-        moves = piece.get_legal()
+        dirty = []
+        for pos, state in self.square_states().items():
+            if full or self.__drawn[pos] != state:
+                dirty.append(self.draw_square(WIN, pos, state))
+                self.__drawn[pos] = state
 
-        for move in moves:
-            if move in self.__mapping and self.__mapping[move].get_color() != piece.get_color():
-                move_x, move_y = move
-                if Checker.in_bounds((2 * move_x - x_idx, 2 * move_y - y_idx)) and (2 * move_x - x_idx, 2 * move_y - y_idx) not in self.__mapping:
-                    self.__capture_moves[(x_idx, y_idx)].append((2 * move_x - x_idx, 2 * move_y - y_idx)) # Add checker's final position post capture to list
-                    ret_val = True
+        return [WIN.get_rect()] if full else dirty
 
-        self.__capture = ret_val
-        return ret_val
-                    
 
-    def captures(self, color: int) -> bool: # Loop through user's checkers and check for possible captures
-        ret_val = False
-        for piece in self.__mapping.values():
-            if piece.get_color() == color:
-                if self.capturable(piece):
-                    ret_val = True
-
-        self.__capture = ret_val
-        return ret_val
-    
-
-    def capture_piece(self, x: int, y: int) -> Checker: # Execute user's capture
-        # Set current position to zero
-        piece = self.__mapping[self.__selection]
-        cur_pos = piece.get_pos()
-        self.__board[cur_pos[1]][cur_pos[0]] = 0
-
-        # Calculate position of piece to be captured and set it to zero; remove from position dictionary
-        capture_x = (cur_pos[0] + x // self.sqr_size) // 2
-        capture_y = (cur_pos[1] + y // self.sqr_size) // 2
-        if 1 == self.__board[capture_y][capture_x]:
-            self.__num_black -= 1 
+    def draw_square(self, WIN: pygame.Surface, pos: tuple, state: tuple) -> pygame.Rect: # Draw a dark square with its piece and highlighting
+        rect = pygame.Rect(pos[0] * self.sqr_size, pos[1] * self.sqr_size, self.sqr_size, self.sqr_size)
+        if self.use_sprites:
+            WIN.blit(self.square_sprite(state), rect)
         else:
-            self.__num_white -= 1
+            self.render_square(WIN, rect, state)
 
-        self.__mapping.pop((capture_x, capture_y), None)
-        self.__board[capture_y][capture_x] = 0
+        return rect
 
-        # Move piece to new position
-        piece.move(self.pos_to_idx(x, y))
-        self.__mapping.pop(self.__selection, None)
-        piece = piece.convert()
-        cur_pos = piece.get_pos()
-        self.__mapping[cur_pos] = piece
 
-        self.__board[cur_pos[1]][cur_pos[0]] = 1 if piece.get_color() else -1
+    def square_sprite(self, state: tuple) -> pygame.Surface: # Return the pre-rendered image of a dark square, rendering it the first time it is needed
+        size = (self.sqr_size, self.radius, self.offset)
+        if size != self.__sprite_size: # Rendered at another size - start over
+            self.__sprites.clear()
+            self.__sprite_size = size
 
-        # Clean up board instance variables post capture
-        self.__capture_moves.clear()
-        self.__selection = ()
-        self.__capture = False
-        self.__last_capture = 0
-        return piece
-    
-
-    def game_not_over(self, color: int) -> bool: # Conditions to determine game state
-        if 0 == self.__num_black or 0 == self.__num_white or not self.can_move(color) or self.__last_capture > 80:
-            return False
-        
-        return True
+        sprite = self.__sprites.get(state)
+        if sprite is None:
+            sprite = pygame.Surface((self.sqr_size, self.sqr_size))
+            self.render_square(sprite, sprite.get_rect(), state)
+            self.__sprites[state] = sprite
 
+        return sprite
 
-    def winner(self) -> str: # Return the winner/indicate it is a draw
-        if 0 == self.__num_black or not self.can_move(1):
-            return "White"
-        
-        elif 0 == self.__num_white or not self.can_move(0):
-            return "Black"
 
-        return "No One"
+    def render_square(self, WIN: pygame.Surface, rect: pygame.Rect, state: tuple) -> None: # Draw a dark square's background, piece and highlight markers
+        piece, markers = state
+        center = (rect.x + self.offset, rect.y + self.offset)
+        pygame.draw.rect(WIN, self.dark, rect)
 
+        if piece:
+            self.draw_piece(WIN, *piece, center)
 
-    def get_piece(self, x: int, y: int) -> int: # If there's a piece at the given indices, return its ID; else return 0
-        if (x,y) in self.__mapping:
-            return self.__mapping[(x,y)].get_id()
-        
-        return 0
+        for color, radius in markers:
+            pygame.draw.circle(WIN, color, center, radius)
 
 
-    def make_ai_move(self, move: float | tuple) -> None: # Process and execute AI's move
-        # Catch all for instance AI provides an illegal move
-        if not isinstance(move, tuple):
-            self.__num_white = 0
-            return
-        
-        # Execute AI's chain capture if possible
-        if move[0]:
-            start = 1
-            num_moves = move[0]
-            while num_moves:
-                self.__selection = (move[start], move[start + 1])
-                self.capture_piece(move[start + 2] * self.sqr_size + 10, move[start + 3] * self.sqr_size + 10)
-                start += 2
-                num_moves -= 1
+    def draw_piece(self, WIN: pygame.Surface, piece_id: int, piece_color: int, center: tuple) -> None: # Draw a checker centred on the given point (with a letter on kings)
+        color, negative_color = (self.black, self.white) if piece_color else (self.white, self.black)
+        pygame.draw.circle(WIN, color, center, self.radius)
+        pygame.draw.circle(WIN, negative_color, center, self.radius + 1, 2)
 
-        # Execute AI's regular move
-        else:
-            self.__selection = (move[1], move[2])
-            self.move(move[3] * self.sqr_size + 10, move[4] * self.sqr_size + 10)
+        if 2 == abs(piece_id):
+            text = STAT_FONT.render("K", 1, self.king_letter)
+            WIN.blit(text, (center[0] - self.offset + 30, center[1] - self.offset + 15))
@@ -0,0 +1,131 @@
+import struct
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from ai import AI
+from records import RecordFile, write_records
+
+# Record: position key (with side to move), weight, number of squares in the move, squares visited (y * 8 + x)
+MAX_SQUARES = 11
+RECORD = struct.Struct(f"<QHB{MAX_SQUARES}s")
+MAGIC = b"CKOB"
+
+
+def encode_move(move: tuple) -> tuple[int, bytes]: # Pack a move tuple as (number of squares, square bytes)
+    squares = bytes(move[i + 1] * 8 + move[i] for i in range(1, len(move), 2))
+    if len(squares) > MAX_SQUARES:
+        raise ValueError(f"move {move} is too long for the book")
+
+    return len(squares), squares
+
+
+def decode_move(count: int, squares: bytes) -> tuple: # Unpack a move into the (capture_depth, x, y, x2, y2, ...) tuple used by AI
+    coordinates = []
+    for square in squares[:count]:
+        coordinates.extend((square % 8, square // 8))
+
+    capture_depth = count - 1 if abs(coordinates[2] - coordinates[0]) == 2 else 0 # Jumps move 2 columns, simple moves 1
+    return (capture_depth, *coordinates)
+
+
+class OpeningBook:
+    def __init__(self, path: str) -> None:
+        self.__records = RecordFile(path, MAGIC, RECORD)
+
+
+    def __len__(self) -> int:
+        return len(self.__records)
+
+
+    def probe(self, key: int) -> list[tuple]: # Return the (move, weight) pairs stored for a position key
+        return [(decode_move(count, squares), weight) for _, weight, count, squares in self.__records.find(key)]
+
+
+    def choose(self, key: int, legal: list[tuple]) -> tuple | None: # Pick a book move at random by weight (only moves that are legal, in case of key collisions)
+        entries = [(move, weight) for move, weight in self.probe(key) if move in legal]
+        if not entries:
+            return None
+
+        return random.choices([move for move, _ in entries], weights=[weight for _, weight in entries])[0]
+
+
+    def close(self) -> None: # Release the memory mapping
+        self.__records.close()
+
+
+def _init_worker() -> None: # Book searches must be reproducible
+    AI.noise = False
+
+
+def _score_moves(board: list[list[int]], color: int, depth: int) -> list[tuple]: # Search every root move of a position and return (move, evaluation) pairs
+    AI.max_depth = depth
+    ai = AI()
+    ai.set_board(board)
+    return [(move, ai.search_move(move, color)) for move in ai.root_moves(color)]
+
+
+def book_positions(plies: int) -> list[tuple]: # Every (board, side to move, key) reachable within `plies` moves of the initial position, for either side moving first
+    ai = AI()
+    positions = {}
+    frontier = [(ai.get_board(), color) for color in (1, -1)]
+
+    for ply in range(plies + 1):
+        next_frontier = []
+        for board, color in frontier:
+            ai.set_board(board)
+            key = ai.get_key(color)
+            if key in positions:
+                continue
+
+            positions[key] = (board, color)
+            if ply < plies:
+                for move in ai.root_moves(color):
+                    ai.make_move(move)
+                    next_frontier.append((ai.get_board(), -color))
+                    ai.undo_move()
+
+        frontier = next_frontier
+
+    return [(board, color, key) for key, (board, color) in positions.items()]
+
+
+def weigh(scored: list[tuple], color: int, margin: float) -> list[tuple]: # Keep moves within `margin` of the best one, weighted by how close they are
+    if not scored:
+        return []
+
+    best = max(score * color for _, score in scored)
+    entries = []
+    for move, score in scored:
+        if score * color == best:
+            entries.append((move, 1000))
+
+        elif best not in (float("inf"), float("-inf")) and best - score * color <= margin:
+            entries.append((move, max(1, round(1000 * (1 - (best - score * color) / margin)))))
+
+    return entries
+
+
+def build(path: str, plies: int, depth: int, margin: float, workers: int | None) -> int: # Search every book position offline and write the book; return the number of records
+    positions = book_positions(plies)
+    rows = []
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(_score_moves, board, color, depth) for board, color, _ in positions]
+        for (_, color, key), future in zip(positions, futures):
+            for move, weight in weigh(future.result(), color, margin):
+                rows.append((key, weight, *encode_move(move)))
+
+    return write_records(path, MAGIC, RECORD, rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the opening book by searching the early positions offline")
+    parser.add_argument("--output", default="book.bin", help="book file to write")
+    parser.add_argument("--plies", type=int, default=4, help="include positions up to this many moves into the game")
+    parser.add_argument("--depth", type=int, default=7, help="AI.max_depth for the offline searches")
+    parser.add_argument("--margin", type=float, default=0.3, help="keep moves evaluated within this margin of the best move")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    count = build(args.output, args.plies, args.depth, args.margin, args.workers)
+    print(f"Wrote {count} book moves to {args.output}")
@@ -1,14 +1,6 @@
-import pygame
-
-pygame.font.init()
-STAT_FONT = pygame.font.SysFont("comicsans", 30)
-
-class Checker:
+class Checker: # Piece logic only; drawing lives in board.Board so the engine can be imported without pygame
     # Static Variables
-    radius = 25
     id = 1
-    sqr_size = 80
-    offset = 40
     white = (255,255,255)
     black = (0,0,0)
 
@@ -16,12 +8,6 @@ class Checker:
         self.x = x
         self.y = y
         self.__color = color
-        self.__negative_color = tuple([(not i) * 255 for i in self.__color])
-
-
-    def draw(self, WIN: pygame.Surface) -> None: # Draw Checker
-        pygame.draw.circle(WIN, self.__color, ((self.x * self.sqr_size + self.offset), (self.y * self.sqr_size + self.offset)), self.radius)
-        pygame.draw.circle(WIN, self.__negative_color, ((self.x * self.sqr_size + self.offset), (self.y * self.sqr_size + self.offset)), self.radius + 1, 2)
 
 
     def get_pos(self) -> tuple: # Return Checker Position
@@ -39,17 +25,12 @@ class Checker:
         self.y = idx[1]
 
 
-    def get_legal(self) -> list[tuple]: # Get checker's legal moves 
-        y_delta = -1 if self.get_color() else 1
-        possible_moves = [(self.x + 1, self.y + y_delta),
-                          (self.x - 1, self.y + y_delta)]
+    def get_legal(self) -> tuple: # Get checker's legal moves 
+        return NEIGHBOURS[1 if self.get_color() else -1, False][self.y][self.x]
 
-        legal = []
-        for move in possible_moves:
-            if self.in_bounds(move):
-                legal.append(move)
 
-        return legal
+    def get_steps(self) -> tuple: # Get (neighbour, landing square after a jump or None) pairs for the checker's legal moves
+        return STEPS[1 if self.get_color() else -1, False][self.y][self.x]
 
 
     def convert(self) -> 'Checker': # Promote the checker to a king
@@ -74,27 +55,54 @@ class Checker:
 class King(Checker):
     # Static Variables
     id = 2
-    red = (255,0,0)
 
     def __init__(self, x: int, y: int, color: int) -> None:
         super().__init__(x, y, color)
 
 
-    def draw(self, WIN: pygame.Surface) -> None: # Draw King
-        super().draw(WIN)
-        text = STAT_FONT.render("K", 1, self.red)
-        WIN.blit(text, ((self.x * self.sqr_size + 30), (self.y * self.sqr_size + 15)))
+    def get_legal(self) -> tuple: # Get King's legal moves
+        return KING_NEIGHBOURS[self.y][self.x]
+
+
+    def get_steps(self) -> tuple: # Get (neighbour, landing square after a jump or None) pairs for the King's legal moves
+        return KING_STEPS[self.y][self.x]
+
+
+# Lookup tables computed once at import so move generation does not build or bounds check coordinates
+def build_steps(directions: tuple) -> list[list[tuple]]: # For every square, the (neighbour, landing square or None) pairs in the given directions
+    table = [[() for x in range(8)] for y in range(8)]
+    for y in range(8):
+        for x in range(8):
+            steps = []
+            for dx, dy in directions:
+                if Checker.in_bounds((x + dx, y + dy)):
+                    landing = (x + 2 * dx, y + 2 * dy)
+                    steps.append(((x + dx, y + dy), landing if Checker.in_bounds(landing) else None))
+
+            table[y][x] = tuple(steps)
+
+    return table
+
+
+def build_neighbours(steps: list[list[tuple]]) -> list[list[tuple]]: # Keep only the neighbours of a steps table
+    return [[tuple(neighbour for neighbour, _ in square) for square in row] for row in steps]
+
 
+# STEPS[color, king][y][x] with color 1 for black (moving up) and -1 for white; directions are
+# forward right, forward left, then (kings only) backward right, backward left - the order AI generates moves in
+STEPS = {(color, king): build_steps(((1, -color), (-1, -color), (1, color), (-1, color))[:4 if king else 2])
+         for color in (1, -1) for king in (False, True)}
+NEIGHBOURS = {kind: build_neighbours(table) for kind, table in STEPS.items()}
 
-    def get_legal(self) -> list[tuple]: # Get King's legal moves
-        possible_moves = [(self.x + 1, self.y + 1),
-                          (self.x + 1, self.y - 1),
-                          (self.x - 1, self.y + 1),
-                          (self.x - 1, self.y - 1)]
+# The same tables keyed by the AI's piece codes (1/-1 men, 2/-2 kings), so a lookup in the search needs no key tuple
+PIECE_STEPS = {color * (2 if king else 1): table for (color, king), table in STEPS.items()}
+PIECE_NEIGHBOURS = {color * (2 if king else 1): table for (color, king), table in NEIGHBOURS.items()}
+# SIMPLE_MOVES[piece][y][x]: (neighbour, move tuple) pairs, so move generation hands out these tuples instead of building new ones
+SIMPLE_MOVES = {piece: [[tuple((neighbour, (0, x, y, *neighbour)) for neighbour in table[y][x]) for x in range(8)] for y in range(8)]
+                for piece, table in PIECE_NEIGHBOURS.items()}
 
-        legal = []
-        for move in possible_moves:
-            if self.in_bounds(move):
-                legal.append(move)
+# Kings on the game board list their moves in a fixed order regardless of color
+KING_STEPS = build_steps(((1, 1), (1, -1), (-1, 1), (-1, -1)))
+KING_NEIGHBOURS = build_neighbours(KING_STEPS)
 
-        return legal
+DARK_SQUARES = tuple((x, y) for y in range(8) for x in range(8) if (x + y) % 2) # (x, y) of the 32 playable squares in row order
@@ -1,7 +1,11 @@
+import os
 import pygame
 import time
 from board import Board
 from ai import AI
+from background import BackgroundSearch
+from book import OpeningBook
+from tablebase import Tablebase
 
 pygame.init()
 pygame.font.init()
@@ -10,12 +14,18 @@ STAT_FONT = pygame.font.SysFont("comicsans", 40)
 WIN_WID = WIN_HEIGHT = 640
 WIN = pygame.display.set_mode((WIN_WID, WIN_HEIGHT))
 
+BOOK_PATH = "book.bin" # Opening book built with `python book.py`; the AI searches every move if it is missing
+TABLEBASE_PATH = "tablebase.bin" # Endgame tablebase built with `python tablebase.py`; optional like the book
+WEIGHTS_PATH = "weights.json" # Evaluation weights fitted by `python tuning.py fit`; AI.weights are used if it is missing
+
 board = Board()
-ai = AI()
+ai = AI(book=OpeningBook(BOOK_PATH) if os.path.exists(BOOK_PATH) else None,
+        tablebase=Tablebase(TABLEBASE_PATH) if os.path.exists(TABLEBASE_PATH) else None,
+        weights=AI.load_weights(WEIGHTS_PATH) if os.path.exists(WEIGHTS_PATH) else None)
+search = BackgroundSearch(ai) # Runs the AI on a worker thread so the window keeps responding
 
-def draw() -> None: # Draw the board and pieces
-    board.draw(WIN)
-    pygame.display.update()
+def draw() -> None: # Draw the squares that changed and update only those parts of the window
+    pygame.display.update(board.draw(WIN))
 
 
 def main() -> None: # Game loop
@@ -66,22 +76,27 @@ def main() -> None: # Game loop
                             board.clear_highlight()
                             move += 1
 
-            else: # AI's move
-                ai.update_move(board)
-                best_move = ai.get_best_move(-1, 0)
-                board.make_ai_move(best_move)
+        if run and not move % 2: # AI's move
+            if not search.searching():
+                search.start(board, -1)
+
+            elif search.done():
+                board.make_ai_move(search.result())
                 move += 1
+                if board.game_not_over(move % 2):
+                    search.ponder(board, 1) # Think about the replies to the user's likely moves on the user's time
 
         draw()
         
     if end: # Display Winner at the end of the game and exit
-        winner = board.winner().upper()
+        winner = board.winner(move % 2).upper()
         text = STAT_FONT.render(f"{winner} IS THE WINNER!", 1, (255, 255, 255) if winner == "WHITE" else (0,0,0))
         WIN.blit(text, (WIN_WID - text.get_width() - (WIN_WID - text.get_width()) // 2, WIN_HEIGHT - text.get_height() - (WIN_HEIGHT - text.get_height()) // 2))
         pygame.display.update()
 
         time.sleep(5)
 
+    search.shutdown() # Stop a search that is still running if the window was closed
     pygame.quit()
     quit()
 
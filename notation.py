@@ -0,0 +1,206 @@
+import re
+import struct
+
+# PDN square numbers: the 32 dark squares numbered 1-32 from black's side, so black starts on 1-12 and moves first.
+# Black plays up the board here, so PDN square n is the 180 degree rotation of PDN row (n - 1) // 4, column (n - 1) % 4
+PDN_SQUARES = [None] + [(7 - 2 * ((n - 1) % 4) - (1 - (n - 1) // 4 % 2), 7 - (n - 1) // 4) for n in range(1, 33)] # Square number -> (x, y)
+SQUARE_NUMBERS = {square: n for n, square in enumerate(PDN_SQUARES) if square} # (x, y) -> square number
+
+INITIAL_FEN = "B:W21,22,23,24,25,26,27,28,29,30,31,32:B1,2,3,4,5,6,7,8,9,10,11,12"
+
+# Binary position: black, white and king masks (bit n - 1 is PDN square n) and the side to move (1 black, 0 white)
+POSITION = struct.Struct("<IIIB")
+
+# PDN movetext
+RESULTS = ("1-0", "0-1", "1/2-1/2", "2-0", "0-2", "1-1", "0-0", "*")
+RESULT_SCORES = {"1-0": 1.0, "2-0": 1.0, "0-1": 0.0, "0-2": 0.0, "1/2-1/2": 0.5, "1-1": 0.5} # Black's (the first mover's) score; other results are unfinished
+HEADER = re.compile(r'\s*\[(\w+)\s+"(.*)"\]\s*$')
+MOVE = re.compile(r"(\d+)(?:[-x](\d+))+")
+MOVE_NUMBER = re.compile(r"^\d+\.+")
+
+
+def to_fen(board: list[list[int]], color: int) -> str: # Write a position (rows of 0, 1/-1 men, 2/-2 kings) and side to move as PDN FEN
+    pieces = {1: [], -1: []}
+    for n in range(1, 33):
+        x, y = PDN_SQUARES[n]
+        piece = board[y][x]
+        if piece:
+            pieces[1 if piece > 0 else -1].append(("K" if 2 == abs(piece) else "") + str(n))
+
+    return f"{'B' if 1 == color else 'W'}:W{','.join(pieces[-1])}:B{','.join(pieces[1])}"
+
+
+def parse_fen(fen: str) -> tuple[list[list[int]], int]: # Read a PDN FEN (kings marked K, ranges like 1-12 allowed); return (rows, side to move)
+    fields = fen.strip().strip('"').rstrip(".").split(":")
+    sides = {"B": 1, "W": -1}
+    if fields[0].strip().upper() not in sides:
+        raise ValueError(f"bad side to move in FEN {fen!r}")
+
+    board = [[0] * 8 for _ in range(8)]
+    for field in fields[1:]:
+        field = field.strip()
+        if not field:
+            continue
+        if field[0].upper() not in sides:
+            raise ValueError(f"bad piece list {field!r} in FEN {fen!r}")
+
+        color = sides[field[0].upper()]
+        for token in field[1:].split(","):
+            token = token.strip()
+            king = token[:1] in ("K", "k")
+            token = token[1:] if king else token
+            if not token:
+                continue
+
+            first, _, last = token.partition("-")
+            for n in range(int(first), int(last or first) + 1):
+                if not 1 <= n <= 32:
+                    raise ValueError(f"bad square {n} in FEN {fen!r}")
+                x, y = PDN_SQUARES[n]
+                board[y][x] = color * (2 if king else 1)
+
+    return board, sides[fields[0].strip().upper()]
+
+
+def to_binary(board: list[list[int]], color: int) -> bytes: # Pack a position into POSITION.size (13) bytes
+    black = white = kings = 0
+    for n in range(1, 33):
+        x, y = PDN_SQUARES[n]
+        piece = board[y][x]
+        if piece > 0:
+            black |= 1 << (n - 1)
+        elif piece < 0:
+            white |= 1 << (n - 1)
+        if 2 == abs(piece):
+            kings |= 1 << (n - 1)
+
+    return POSITION.pack(black, white, kings, 1 if 1 == color else 0)
+
+
+def from_binary(data: bytes) -> tuple[list[list[int]], int]: # Unpack a position made by to_binary; return (rows, side to move)
+    black, white, kings, side = POSITION.unpack(data)
+    board = [[0] * 8 for _ in range(8)]
+    for n in range(1, 33):
+        bit = 1 << (n - 1)
+        if (black | white) & bit:
+            x, y = PDN_SQUARES[n]
+            board[y][x] = (1 if black & bit else -1) * (2 if kings & bit else 1)
+
+    return board, 1 if side else -1
+
+
+def parse_position(position: str | bytes) -> tuple[list[list[int]], int]: # Read a FEN string or a binary position
+    return from_binary(position) if isinstance(position, (bytes, bytearray)) else parse_fen(position)
+
+
+def move_to_pdn(move: tuple) -> str: # Write an AI move tuple as PDN (11-15, or 15x24x31 for captures)
+    squares = [str(SQUARE_NUMBERS[move[i], move[i + 1]]) for i in range(1, len(move), 2)]
+    return ("x" if move[0] else "-").join(squares)
+
+
+def pdn_to_move(text: str, legal: list[tuple]) -> tuple: # Find the legal move a PDN move stands for (captures may list only the first and last squares)
+    squares = [int(square) for square in re.split("[-x]", text)]
+    matches = []
+    for move in legal:
+        path = [SQUARE_NUMBERS[move[i], move[i + 1]] for i in range(1, len(move), 2)]
+        if path[0] == squares[0] and path[-1] == squares[-1] and all(square in path for square in squares):
+            matches.append(move)
+
+    if 1 != len(matches):
+        raise ValueError(f"PDN move {text} matches {len(matches)} legal moves")
+
+    return matches[0]
+
+
+def read_pdn(lines): # Stream games from an iterable of lines (e.g. an open file); yields {"headers": {...}, "moves": [PDN moves], "result": str}
+    headers, moves = {}, []
+    in_comment = False
+    variation = 0 # Nesting depth of (variations), whose moves are not part of the game
+
+    for line in lines:
+        match = HEADER.match(line)
+        if match and not in_comment and not variation:
+            if moves: # A game without a result token ends where the next one's headers start
+                yield {"headers": headers, "moves": moves, "result": headers.get("Result", "*")}
+                headers, moves = {}, []
+            headers[match.group(1)] = match.group(2)
+            continue
+
+        # Drop {comments} and (variations), which may span lines; variations may nest and contain comments
+        text = []
+        while line:
+            if in_comment:
+                end = line.find("}")
+                line = "" if end < 0 else line[end + 1:]
+                in_comment = end < 0
+                continue
+
+            starts = [idx for idx in (line.find("{"), line.find("("), line.find(")")) if idx >= 0]
+            if not starts:
+                if not variation:
+                    text.append(line)
+                break
+
+            idx = min(starts)
+            if not variation:
+                text.append(line[:idx])
+            if "{" == line[idx]:
+                in_comment = True
+            elif "(" == line[idx]:
+                variation += 1
+            else:
+                variation = max(0, variation - 1)
+            line = line[idx + 1:]
+
+        for token in " ".join(text).split():
+            if token in RESULTS:
+                yield {"headers": headers, "moves": moves, "result": token}
+                headers, moves = {}, []
+                continue
+
+            token = MOVE_NUMBER.sub("", token).rstrip("!?")
+            if MOVE.fullmatch(token):
+                moves.append(token)
+
+    if moves or headers:
+        yield {"headers": headers, "moves": moves, "result": headers.get("Result", "*")}
+
+
+def write_pdn(file, games, line_length: int = 79) -> int: # Write games (dicts as yielded by read_pdn) to an open text file one at a time; return the number written
+    count = 0
+    for game in games:
+        headers = dict(game.get("headers", {}))
+        headers.setdefault("Result", game.get("result", "*"))
+        for key, value in headers.items():
+            file.write(f'[{key} "{value}"]\n')
+
+        # Black moves first unless a FEN header says otherwise
+        black_first = parse_fen(headers["FEN"])[1] == 1 if "FEN" in headers else True
+        tokens = [] if black_first else ["1.", "..."]
+        for ply, move in enumerate(game["moves"], 0 if black_first else 1):
+            if not ply % 2 and (ply or black_first):
+                tokens.append(f"{ply // 2 + 1}.")
+            tokens.append(move if isinstance(move, str) else move_to_pdn(move))
+        tokens.append(headers["Result"])
+
+        line = ""
+        for token in tokens:
+            if line and len(line) + 1 + len(token) > line_length:
+                file.write(line + "\n")
+                line = token
+            else:
+                line = f"{line} {token}" if line else token
+        file.write(line + "\n\n")
+        count += 1
+
+    return count
+
+
+def replay(game: dict, ai): # Play a game's moves on an AI; yields (rows, side to move, move tuple) before each move
+    board, color = parse_fen(game["headers"].get("FEN", INITIAL_FEN))
+    ai.set_board(board)
+    for text in game["moves"]:
+        move = pdn_to_move(text, ai.root_moves(color))
+        yield ai.get_board(), color, move
+        ai.make_move(move)
+        color = -color
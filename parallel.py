@@ -0,0 +1,138 @@
+import os
+import math
+import time
+import argparse
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from ai import AI
+
+_worker_ai = None # Each worker process keeps its own AI (and transposition table) between tasks
+
+
+def _init_worker(noise: bool) -> None: # Create the worker's AI once when the process starts
+    global _worker_ai
+    AI.noise = noise
+    _worker_ai = AI()
+
+
+def _search_move(board: list[list[int]], color: int, move: tuple, max_depth: int, alpha: float = float("-inf"), beta: float = float("inf")) -> tuple: # Search one root move on the worker's own copy of the position
+    _worker_ai.max_depth = max_depth
+    _worker_ai.set_board(board)
+    move_eval = _worker_ai.search_move(move, color, alpha, beta)
+    return move_eval, _worker_ai.get_nodes()
+
+
+class ParallelSearch:
+    def __init__(self, workers: int | None = None) -> None:
+        self.__workers = workers or os.cpu_count() or 1
+        self.__pool = ProcessPoolExecutor(max_workers=self.__workers, initializer=_init_worker, initargs=(AI.noise,))
+        self.__nodes = 0
+
+
+    def get_workers(self) -> int: # Return the number of worker processes
+        return self.__workers
+
+
+    def get_nodes(self) -> int: # Return the nodes visited by all workers in the last search
+        return self.__nodes
+
+
+    def get_best_move(self, board: list[list[int]], color: int, max_depth: int | None = None) -> float | tuple: # Split the root moves across the pool and merge the results
+        max_depth = AI.max_depth if max_depth is None else max_depth
+        root = AI(table_size=0)
+        root.set_board(board)
+        moves = root.root_moves(color)
+
+        self.__nodes = 1
+        best_move = best_eval = float("inf") if color == -1 else float("-inf")
+        if not moves:
+            return best_move
+
+        # The first move gets a full window; its exact evaluation is the best so far
+        ordered = root.order_moves(moves, color, 0)
+        best_eval, nodes = self.__pool.submit(_search_move, board, color, ordered[0], max_depth).result()
+        self.__nodes += nodes
+        evals = {ordered[0]: best_eval}
+
+        # The rest only need to show whether they beat the best so far, so each gets a window just around it:
+        # below it a move is worse, inside it the evaluation is exact (ties included) and above it the move is re-searched for its exact evaluation.
+        # Only one task per worker is in flight, so moves that start later are searched against the latest best
+        waiting = deque(ordered[1:])
+        running = {} # Future -> (move, window it is searched with)
+        while waiting or running:
+            while waiting and len(running) < self.__workers:
+                move = waiting.popleft()
+                if math.isfinite(best_eval):
+                    window = (best_eval - AI.window, best_eval + AI.window)
+                else: # A won or lost best leaves no window (alpha == beta stores wrong bounds), so the move is searched in full
+                    window = (float("-inf"), float("inf"))
+                running[self.__pool.submit(_search_move, board, color, move, max_depth, *window)] = move, window
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                move, (alpha, beta) = running.pop(future)
+                move_eval, nodes = future.result()
+                self.__nodes += nodes
+                if (move_eval >= beta if 1 == color else move_eval <= alpha) and math.isfinite(beta - alpha):
+                    # Beat the best: the evaluation is a bound the move is known to reach, so the re-search starts just short of it
+                    window = (move_eval - AI.window, float("inf")) if 1 == color else (float("-inf"), move_eval + AI.window)
+                    running[self.__pool.submit(_search_move, board, color, move, max_depth, *window)] = move, window
+                    continue
+
+                evals[move] = move_eval
+                if move_eval > best_eval if 1 == color else move_eval < best_eval:
+                    best_eval = move_eval
+
+        # Merging in the original order with the backtrack rule (the later of equal moves wins) picks the serial search's move;
+        # evaluations that are only bounds are worse than the best exact evaluation, so they never win
+        best_eval = float("inf") if color == -1 else float("-inf")
+        for move in moves:
+            move_eval = evals[move]
+            if move_eval <= best_eval if color == -1 else move_eval >= best_eval:
+                best_move, best_eval = move, move_eval
+
+        return best_move
+
+
+    def compare(self, board: list[list[int]], color: int, max_depth: int | None = None) -> dict: # Time the parallel search against the serial alpha-beta search
+        serial = AI()
+        serial.set_board(board)
+        if max_depth is not None:
+            serial.max_depth = max_depth
+
+        start = time.perf_counter()
+        serial_move = serial.get_best_move(color, 0)
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parallel_move = self.get_best_move(board, color, max_depth)
+        parallel_time = time.perf_counter() - start
+
+        return {"workers": self.__workers,
+                "serial_move": serial_move,
+                "parallel_move": parallel_move,
+                "same_move": serial_move == parallel_move,
+                "serial_seconds": serial_time,
+                "parallel_seconds": parallel_time,
+                "serial_nodes": serial.get_nodes(),
+                "parallel_nodes": self.__nodes,
+                "speedup": serial_time / parallel_time if parallel_time else 0.0}
+
+
+    def shutdown(self) -> None: # Stop the worker processes
+        self.__pool.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the root-split parallel search with the serial search on the initial position")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--depth", type=int, default=AI.max_depth, help="AI.max_depth to search with")
+    parser.add_argument("--color", type=int, default=-1, choices=(1, -1), help="side to move (1 black, -1 white)")
+    args = parser.parse_args()
+
+    AI.noise = False # Both searches must see the same evaluations
+    search = ParallelSearch(args.workers)
+    try:
+        print(search.compare(AI().get_board(), args.color, args.depth))
+    finally:
+        search.shutdown()
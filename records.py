@@ -0,0 +1,74 @@
+import os
+import mmap
+import struct
+
+# On-disk format shared by the opening book and the endgame tablebase:
+# an 8 byte header (4 byte magic, 4 byte record size) followed by fixed size records sorted by their first field, an unsigned 64 bit key
+HEADER = struct.Struct("<4sI")
+KEY = struct.Struct("<Q")
+
+
+def write_records(path: str, magic: bytes, record: struct.Struct, rows: list[tuple]) -> int: # Sort rows by key and write them; return the number of records
+    rows = sorted(rows, key=lambda row: row[0])
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(magic, record.size))
+        for row in rows:
+            file.write(record.pack(*row))
+
+    return len(rows)
+
+
+class RecordFile: # Memory mapped, read only view of a record file; lookups binary search the mapping without loading it
+    def __init__(self, path: str, magic: bytes, record: struct.Struct) -> None: # magic may be a prefix; the rest of the file's magic can carry parameters
+        self.__record = record
+        self.__map = None
+        self.__file = open(path, "rb")
+        size = os.fstat(self.__file.fileno()).st_size
+        if size < HEADER.size:
+            self.__file.close()
+            raise ValueError(f"{path} is not a record file")
+
+        self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        file_magic, record_size = HEADER.unpack_from(self.__map, 0)
+        if file_magic[:len(magic)] != magic or record_size != record.size or (size - HEADER.size) % record.size:
+            self.close()
+            raise ValueError(f"{path} has the wrong format")
+
+        self.__magic = file_magic
+        self.__count = (size - HEADER.size) // record.size
+
+
+    def __len__(self) -> int:
+        return self.__count
+
+
+    def get_magic(self) -> bytes: # Return the full 4 byte magic from the header
+        return self.__magic
+
+
+    def key_at(self, idx: int) -> int: # Return the key of the idx-th record
+        return KEY.unpack_from(self.__map, HEADER.size + idx * self.__record.size)[0]
+
+
+    def find(self, key: int) -> list[tuple]: # Return every record with the given key
+        low, high = 0, self.__count
+        while low < high: # Find the first record with a key >= key
+            mid = (low + high) // 2
+            if self.key_at(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+
+        found = []
+        while low < self.__count and self.key_at(low) == key:
+            found.append(self.__record.unpack_from(self.__map, HEADER.size + low * self.__record.size))
+            low += 1
+
+        return found
+
+
+    def close(self) -> None: # Release the mapping and the file
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+        self.__file.close()
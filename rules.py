@@ -0,0 +1,293 @@
+from collections import defaultdict
+from checker import Checker, King
+from notation import parse_position
+
+class Rules: # Game state and rules without any drawing; board.Board adds the pygame view
+    # Static Variables
+    sqr_size = 80
+    black = (0,0,0)
+    white = (255,255,255)
+    board_size = 8
+
+    def __init__(self) -> None:
+        self.__capture_highlight = True
+        self.__last_capture = 0
+        self.__num_white = 12
+        self.__num_black = 12
+        
+        self.__moves = []
+        self.__capture_moves = defaultdict(list)
+        self.__capture = False
+        self.__selection = ()
+        self.__legal = {} # Checker color code -> (captures, moves) of the current position; cleared whenever a piece moves
+
+        self.__board = [[0,-1,0,-1,0,-1,0,-1],
+                      [-1,0,-1,0,-1,0,-1,0],
+                      [0,-1,0,-1,0,-1,0,-1],
+                      [0,0,0,0,0,0,0,0],
+                      [0,0,0,0,0,0,0,0],
+                      [1,0,1,0,1,0,1,0],
+                      [0,1,0,1,0,1,0,1],
+                      [1,0,1,0,1,0,1,0]]
+        
+        # Store the checkers' positions in a dictionary for easy retrieval
+        self.__mapping = defaultdict(Checker)
+        for i in range(8):
+            for j in range(8):
+                if -1 == self.__board[j][i]:
+                    self.__mapping[(i,j)] = Checker(i, j, self.white)
+                elif 1 == self.__board[j][i]:
+                    self.__mapping[(i,j)] = Checker(i, j, self.black)
+
+
+    @classmethod
+    def from_position(cls, position: str | bytes) -> tuple: # Build a board from a FEN string or binary position (see notation); return (board, side to move)
+        board, color = parse_position(position)
+        rules = cls()
+        rules.set_board(board)
+        return rules, color
+
+
+    def set_board(self, board: list[list[int]]) -> None: # Load a position given as rows of 0, 1/-1 for men, 2/-2 for kings
+        self.__mapping.clear()
+        self.__num_black = self.__num_white = 0
+        for y in range(8):
+            for x in range(8):
+                self.__board[y][x] = (board[y][x] > 0) - (board[y][x] < 0)
+                if board[y][x]:
+                    piece = King if 2 == abs(board[y][x]) else Checker
+                    self.__mapping[(x,y)] = piece(x, y, self.black if board[y][x] > 0 else self.white)
+                    if board[y][x] > 0:
+                        self.__num_black += 1
+                    else:
+                        self.__num_white += 1
+
+        # Forget everything about the previous position
+        self.__last_capture = 0
+        self.__legal.clear()
+        self.__capture_moves.clear()
+        self.clear_highlight()
+        self.__capture = False
+
+
+    def get_pieces(self) -> list[Checker]: # Return all checkers on the board
+        return list(self.__mapping.values())
+
+
+    def legal(self, color: int) -> tuple[dict, dict]: # Return a side's captures and simple moves as {position: [landing squares]}, computed once per position
+        if color not in self.__legal:
+            captures, moves = {}, {}
+            for pos, landing, capture in self.iter_legal(color):
+                (captures if capture else moves).setdefault(pos, []).append(landing)
+
+            self.__legal[color] = (captures, moves)
+
+        return self.__legal[color]
+
+
+    def iter_legal(self, color: int): # Yield a side's (position, landing square, is capture) one at a time, so a caller that stops early skips generating the rest
+        mapping = self.__mapping
+        for pos, piece in mapping.items():
+            if piece.get_color() != color:
+                continue
+
+            for move, landing in piece.get_steps():
+                if landing and move in mapping and mapping[move].get_color() != color and landing not in mapping:
+                    yield pos, landing, True
+
+            for move in piece.get_legal():
+                if move not in mapping:
+                    yield pos, move, False
+
+
+    def get_highlights(self) -> tuple[dict, list]: # Return (capture moves to highlight, selected checker's moves); only one of them is non empty
+        if not self.__selection and self.__capture and self.__capture_highlight:
+            return self.__capture_moves, []
+
+        return {}, self.__moves
+
+
+    def pos_to_idx(self, x: int, y: int) -> tuple: # Convert position on board to indices
+        return (x // self.sqr_size, y // self.sqr_size)
+    
+
+    def get_color(self, x: int, y: int) -> int: # Get the integer code for the checker's color
+        x_idx, y_idx = self.pos_to_idx(x, y)
+        if (x_idx, y_idx) in self.__mapping:
+            return self.__mapping[(x_idx, y_idx)].get_color()
+        return -1
+    
+
+    def get_legal(self, x: int, y: int) -> None: # Return all legal moves of a checker
+        x_idx, y_idx = self.pos_to_idx(x, y)
+        self.__selection = (x_idx, y_idx)
+
+        # If a checker can be captured, only include those moves (forced capturing)
+        if self.__capture:
+            for move in self.__capture_moves[self.__selection]:
+                self.__moves.append(move)
+            if 0 == len(self.__moves):
+                self.__selection = ()
+        
+        # Any move if capturing is not forced
+        else:
+            color = self.__mapping[self.__selection].get_color()
+            self.__moves.extend(self.legal(color)[1].get(self.__selection, []))
+
+
+    def clear_highlight(self) -> None: # Clear move highlighting
+        self.__moves.clear()
+        self.__selection = ()
+        self.__capture_highlight = True
+
+
+    def toggle_capture_highlight(self) -> None: # Toggle between highlighting possible captures
+        self.__capture_highlight = not self.__capture_highlight
+        self.clear_highlight()
+
+
+    def in_legal(self, x: int, y: int) -> bool: # Check if user's move is valid
+        return self.pos_to_idx(x, y) in self.__moves
+    
+
+    def movable(self, piece: Checker) -> bool: # Check if a move is valid
+        return piece.get_pos() in self.legal(piece.get_color())[1]
+                    
+
+    def can_move(self, color: int) -> bool: # Check if any of the user's checkers has a simple move (stops at the first one unless legal() is already cached)
+        if color in self.__legal:
+            return bool(self.__legal[color][1])
+        return any(not capture for _, _, capture in self.iter_legal(color))
+
+
+    def has_moves(self, color: int) -> bool: # Check if a side has any capture or simple move (stops at the first one unless legal() is already cached)
+        if color in self.__legal:
+            captures, moves = self.__legal[color]
+            return bool(captures or moves)
+        return next(self.iter_legal(color), None) is not None
+    
+
+    def move(self, x: int, y: int) -> None: # Execute user's move
+        # Set piece's current position to zero
+        piece = self.__mapping[self.__selection]
+        cur_pos = piece.get_pos()
+        self.__board[cur_pos[1]][cur_pos[0]] = 0
+
+        # Move piece to new square and update position dictionary
+        piece.move(self.pos_to_idx(x, y))
+        self.__mapping.pop(self.__selection, None)
+        piece = piece.convert()
+        cur_pos = piece.get_pos()
+        self.__mapping[cur_pos] = piece
+
+        self.__board[cur_pos[1]][cur_pos[0]] = 1 if piece.get_color() else -1
+        self.__last_capture += 1
+        self.__legal.clear()
+
+    
+    def capturable(self, piece: Checker) -> bool: # Check for possible captures by a checker and add them to a list
+        landings = self.legal(piece.get_color())[0].get(piece.get_pos(), [])
+        self.__capture_moves[piece.get_pos()].extend(landings) # Add checker's final positions post capture to list
+
+        self.__capture = bool(landings)
+        return self.__capture
+                    
+
+    def captures(self, color: int) -> bool: # Look up the user's possible captures in the cache
+        self.__capture_moves.clear()
+        for pos, landings in self.legal(color)[0].items():
+            self.__capture_moves[pos].extend(landings)
+
+        self.__capture = bool(self.__capture_moves)
+        return self.__capture
+    
+
+    def capture_piece(self, x: int, y: int) -> Checker: # Execute user's capture
+        # Set current position to zero
+        piece = self.__mapping[self.__selection]
+        cur_pos = piece.get_pos()
+        self.__board[cur_pos[1]][cur_pos[0]] = 0
+
+        # Calculate position of piece to be captured and set it to zero; remove from position dictionary
+        capture_x = (cur_pos[0] + x // self.sqr_size) // 2
+        capture_y = (cur_pos[1] + y // self.sqr_size) // 2
+        if 1 == self.__board[capture_y][capture_x]:
+            self.__num_black -= 1 
+        else:
+            self.__num_white -= 1
+
+        self.__mapping.pop((capture_x, capture_y), None)
+        self.__board[capture_y][capture_x] = 0
+
+        # Move piece to new position
+        piece.move(self.pos_to_idx(x, y))
+        self.__mapping.pop(self.__selection, None)
+        piece = piece.convert()
+        cur_pos = piece.get_pos()
+        self.__mapping[cur_pos] = piece
+
+        self.__board[cur_pos[1]][cur_pos[0]] = 1 if piece.get_color() else -1
+
+        # Clean up board instance variables post capture
+        self.__legal.clear()
+        self.__capture_moves.clear()
+        self.__selection = ()
+        self.__capture = False
+        self.__last_capture = 0
+        return piece
+    
+
+    def game_not_over(self, color: int) -> bool: # Conditions to determine game state
+        if 0 == self.__num_black or 0 == self.__num_white or not self.has_moves(color) or self.__last_capture > 80:
+            return False
+        
+        return True
+
+
+    def winner(self, color: int | None = None) -> str: # Return the winner/indicate it is a draw; color is the side to move, which loses if it is stuck
+        if 0 == self.__num_black:
+            return "White"
+
+        elif 0 == self.__num_white:
+            return "Black"
+
+        elif color is not None:
+            if not self.has_moves(color):
+                return "White" if color else "Black"
+
+        elif not self.has_moves(1):
+            return "White"
+        
+        elif not self.has_moves(0):
+            return "Black"
+
+        return "No One"
+
+
+    def get_piece(self, x: int, y: int) -> int: # If there's a piece at the given indices, return its ID; else return 0
+        if (x,y) in self.__mapping:
+            return self.__mapping[(x,y)].get_id()
+        
+        return 0
+
+
+    def make_ai_move(self, move: float | tuple) -> None: # Process and execute AI's move
+        # Catch all for instance AI provides an illegal move
+        if not isinstance(move, tuple):
+            self.__num_white = 0
+            return
+        
+        # Execute AI's chain capture if possible
+        if move[0]:
+            start = 1
+            num_moves = move[0]
+            while num_moves:
+                self.__selection = (move[start], move[start + 1])
+                self.capture_piece(move[start + 2] * self.sqr_size + 10, move[start + 3] * self.sqr_size + 10)
+                start += 2
+                num_moves -= 1
+
+        # Execute AI's regular move
+        else:
+            self.__selection = (move[1], move[2])
+            self.move(move[3] * self.sqr_size + 10, move[4] * self.sqr_size + 10)
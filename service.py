@@ -0,0 +1,296 @@
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from ai import AI
+from notation import parse_fen, move_to_pdn
+
+_worker_ai = None # Each worker process keeps its own AI (and transposition table) between requests
+
+
+def _init_worker(noise: bool) -> None: # Create the worker's AI once when the process starts and run a small search so the first request is not slow
+    global _worker_ai
+    AI.noise = noise
+    _worker_ai = AI()
+    _worker_ai.max_depth = 2
+    _worker_ai.get_best_move(1, 0)
+
+
+def _ping() -> int: # Used to start every worker before the first request
+    return os.getpid()
+
+
+def _analyze(board: list[list[int]], color: int, depth: int, timeout: int | None) -> dict: # Search one position on the worker's AI
+    ai = _worker_ai
+    ai.set_board(board)
+    ai.max_depth = depth
+    start = time.perf_counter()
+    if timeout:
+        # Deepen up to the requested depth; if time runs out the deepest finished iteration's move is returned
+        ai.max_iterations = depth + 1
+        move = ai.get_best_move(color, 0, timeout)
+        depth = ai.get_depth()
+    else:
+        move = ai.get_best_move(color, 0)
+
+    move = move if isinstance(move, tuple) else None
+    score = ai.get_score() if move else -color * float("inf") # No legal moves: the side to move has lost
+    forced = score is not None and not math.isfinite(score) # The search found a forced win
+    return {"move": move_to_pdn(move) if move else None,
+            "path": list(move) if move else None,
+            "score": None if forced else score,
+            "forced_win": ("black" if score > 0 else "white") if forced else None,
+            "depth": depth,
+            "nodes": ai.get_nodes(),
+            "search_seconds": time.perf_counter() - start}
+
+
+def parse_request(request: dict) -> tuple: # Read a request into (board, color, depth, timeout); raises ValueError if it is malformed
+    if not isinstance(request, dict):
+        raise ValueError("request must be a JSON object")
+
+    if "fen" in request:
+        board, color = parse_fen(request["fen"])
+    elif "board" in request:
+        board, color = request["board"], request.get("color", 1)
+        if 8 != len(board) or any(8 != len(row) for row in board) or any(piece not in (-2, -1, 0, 1, 2) for row in board for piece in row):
+            raise ValueError("board must be 8 rows of 8 values in -2..2")
+    else:
+        raise ValueError("request needs a fen or a board")
+
+    if color not in (1, -1):
+        raise ValueError("color must be 1 (black) or -1 (white)")
+
+    depth = request.get("depth", AI.max_depth)
+    if not isinstance(depth, int) or not 0 <= depth < AI.max_iterations:
+        raise ValueError(f"depth must be an integer from 0 to {AI.max_iterations - 1}")
+
+    timeout = request.get("timeout")
+    if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+        raise ValueError("timeout must be a positive number of milliseconds")
+
+    return board, color, depth, timeout
+
+
+class AnalysisService: # Fans analysis requests out to a pool of worker processes
+    # Static Variables
+    default_timeout = 10000 # Milliseconds a request may search when it does not set its own timeout
+    grace = 2.0 # Seconds past its timeout after which a request is answered with a timeout error
+
+    def __init__(self, workers: int | None = None, max_pending: int | None = None, timeout: int | None = default_timeout) -> None:
+        self.__workers = workers or os.cpu_count() or 1
+        self.__timeout = timeout
+        self.__pool = ProcessPoolExecutor(max_workers=self.__workers, initializer=_init_worker, initargs=(AI.noise,))
+        self.__slots = threading.BoundedSemaphore(max_pending or 2 * self.__workers) # Requests submitted but not finished by a worker
+
+        # Stats, shared with the pool's callback thread under the lock
+        self.__lock = threading.Lock()
+        self.__started = time.perf_counter()
+        self.__latencies = [] # Seconds from submit to response of every answered request
+        self.__errors = 0
+        self.__timeouts = 0
+        self.__rejected = 0
+
+
+    def warm(self) -> None: # Start every worker process and wait until they are ready
+        futures = [self.__pool.submit(_ping) for _ in range(self.__workers)]
+        for future in futures:
+            future.result()
+        self.__started = time.perf_counter()
+
+
+    def submit(self, request: dict, block: bool = True) -> Future | None: # Queue a request; return a future of its response (None if the queue is full and block is False)
+        response = Future()
+        request_id = request.get("id") if isinstance(request, dict) else None
+        try:
+            board, color, depth, timeout = parse_request(request)
+        except (ValueError, TypeError) as error:
+            self.__finish(response, request_id, time.perf_counter(), {"error": str(error)})
+            return response
+
+        # Back-pressure: wait for (or give up on) a free slot
+        if not self.__slots.acquire(blocking=block):
+            with self.__lock:
+                self.__rejected += 1
+            return None
+
+        start = time.perf_counter()
+        timeout = timeout or self.__timeout
+        future = self.__pool.submit(_analyze, board, color, depth, timeout)
+
+        def done(future: Future) -> None:
+            self.__slots.release() # The worker is free again, even if the request already timed out
+            try:
+                result = future.result()
+            except Exception as error:
+                result = {"error": f"{type(error).__name__}: {error}"}
+            self.__finish(response, request_id, start, result)
+        future.add_done_callback(done)
+
+        if timeout: # A worker may still be busy with earlier requests, so the timeout also covers time spent queued
+            timer = threading.Timer(timeout / 1000 + self.grace, self.__finish, (response, request_id, start, {"error": "timeout"}))
+            timer.daemon = True
+            timer.start()
+            response.add_done_callback(lambda _: timer.cancel())
+
+        return response
+
+
+    def __finish(self, response: Future, request_id, start: float, result: dict) -> None: # Answer a request once (a late worker result after a timeout is dropped)
+        with self.__lock:
+            if response.done():
+                return
+
+            self.__latencies.append(time.perf_counter() - start)
+            if "error" in result:
+                self.__errors += 1
+                if "timeout" == result["error"]:
+                    self.__timeouts += 1
+
+            response.set_result({"id": request_id, **result})
+
+
+    def reject(self, request_id, error: str) -> Future: # Answer a request that could not be read (e.g. invalid JSON) with an error, counted like the others
+        response = Future()
+        self.__finish(response, request_id, time.perf_counter(), {"error": error})
+        return response
+
+
+    def analyze(self, request: dict) -> dict: # Run one request and wait for its response
+        return self.submit(request).result()
+
+
+    def get_stats(self) -> dict: # Return throughput and latency percentiles of the answered requests
+        with self.__lock:
+            latencies = sorted(self.__latencies)
+            elapsed = time.perf_counter() - self.__started
+            stats = {"workers": self.__workers,
+                     "requests": len(latencies),
+                     "errors": self.__errors,
+                     "timeouts": self.__timeouts,
+                     "rejected": self.__rejected,
+                     "seconds": elapsed,
+                     "throughput": len(latencies) / elapsed if elapsed else 0.0}
+
+        # Nearest-rank percentiles in milliseconds
+        stats["latency_ms"] = {f"p{p}": 1000 * latencies[max(0, math.ceil(p / 100 * len(latencies)) - 1)] if latencies else None
+                               for p in (50, 90, 95, 99)}
+        stats["latency_ms"]["max"] = 1000 * latencies[-1] if latencies else None
+        return stats
+
+
+    def shutdown(self) -> None: # Stop the worker processes (waits for running requests)
+        self.__pool.shutdown(wait=True)
+
+
+def run_stdio(service: AnalysisService, lines, output) -> None: # Answer JSON-lines requests read from lines; responses are written as they finish and carry the request's id
+    lock = threading.Lock()
+    pending = []
+
+    def write(result: dict) -> None:
+        with lock:
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as error:
+            response = service.reject(None, f"invalid JSON: {error}")
+        else:
+            response = service.submit(request) # Blocks while the queue is full, so reading stops until workers catch up
+        response.add_done_callback(lambda response: write(response.result()))
+        pending = [response for response in pending if not response.done()] + [response]
+
+    for response in pending:
+        response.result()
+
+
+def make_handler(service: AnalysisService): # Build the HTTP handler class: POST /analyze with JSON lines, GET /stats
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            if self.path != "/analyze":
+                return self.reply(404, [{"error": "not found"}])
+
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+            results = []
+            busy = 0
+            for line in body.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as error:
+                    results.append(service.reject(None, f"invalid JSON: {error}"))
+                    continue
+
+                response = service.submit(request, block=False)
+                if response is None: # Back-pressure: requests that find the queue full are answered with busy right away
+                    busy += 1
+                    results.append({"id": request.get("id"), "error": "busy"})
+                else:
+                    results.append(response)
+
+            results = [result.result() if isinstance(result, Future) else result for result in results]
+            busy = results and busy == len(results) # 503 only if nothing got in
+
+            self.reply(503 if busy else 200, results)
+
+
+        def do_GET(self) -> None:
+            if self.path != "/stats":
+                return self.reply(404, [{"error": "not found"}])
+            self.reply(200, [service.get_stats()])
+
+
+        def reply(self, status: int, results: list[dict]) -> None: # Send one JSON line per result
+            body = "".join(json.dumps(result) + "\n" for result in results).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Content-Length", str(len(body)))
+            if 503 == status:
+                self.send_header("Retry-After", "1")
+            self.end_headers()
+            self.wfile.write(body)
+
+
+        def log_message(self, format, *args) -> None: # Keep stderr for the stats
+            pass
+
+    return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer JSON-lines analysis requests ({\"id\": ..., \"fen\": \"B:W21-32:B1-12\", \"depth\": 4, \"timeout\": 1000}) with a pool of engine processes")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--max-pending", type=int, default=None, help="requests queued or running at once (default: 2 per worker)")
+    parser.add_argument("--timeout", type=int, default=AnalysisService.default_timeout, help="default per-request time limit in milliseconds")
+    parser.add_argument("--http", type=int, default=None, metavar="PORT", help="serve POST /analyze and GET /stats on localhost instead of stdin/stdout")
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind in HTTP mode")
+    args = parser.parse_args()
+
+    AI.noise = False # Answers should not depend on the random evaluation noise
+    service = AnalysisService(args.workers, args.max_pending, args.timeout)
+    service.warm()
+    try:
+        if args.http is None:
+            run_stdio(service, sys.stdin, sys.stdout)
+        else:
+            server = ThreadingHTTPServer((args.host, args.http), make_handler(service))
+            print(f"Serving on http://{args.host}:{server.server_address[1]}", file=sys.stderr)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                server.server_close()
+    finally:
+        print(json.dumps(service.get_stats()), file=sys.stderr)
+        service.shutdown()
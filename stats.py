@@ -0,0 +1,173 @@
+import io
+import json
+import time
+import pstats
+import cProfile
+from collections import defaultdict
+
+# Methods timed by each timer (the wrapped methods are called many times per search, so only these are instrumented)
+TIMERS = {"move_generation": ("possible_captures", "possible_moves", "count_moves"),
+          "evaluate": ("evaluate",),
+          "make_undo": ("make_move", "undo_move")}
+
+
+class SearchStats: # Per search counters for an AI; attaching wraps the AI's methods, so a detached AI runs at full speed
+    def __init__(self, ai, profile: bool = False, profile_lines: int = 20) -> None:
+        self.__ai = ai
+        self.__profile = profile # Run cProfile around every root search
+        self.__profile_lines = profile_lines # Functions listed in the stats (by cumulative time)
+        self.__profiler = None
+        self.__wrapped = []
+        self.__stats = {}
+        self.reset()
+
+
+    def reset(self) -> None: # Clear the counters before a search
+        self.__nodes = defaultdict(int) # depth -> nodes visited
+        self.__chains = 0
+        self.__calls = defaultdict(int) # timer name -> calls
+        self.__seconds = defaultdict(float) # timer name -> seconds
+        self.__running = [] # [timer name, start] of the timed calls in progress, innermost last
+        self.__interior = 0 # Nodes whose moves were searched
+        self.__children = 0 # Moves searched at those nodes
+        self.__profiler = cProfile.Profile() if self.__profile else None
+
+
+    def attach(self) -> None: # Wrap the AI's methods with counting/timing versions (instance attributes shadow the class methods)
+        if self.__wrapped:
+            return
+
+        self.__wrap("get_best_move", self.__root)
+        self.__wrap("search_root", self.__counter(False))
+        self.__wrap("alpha_beta", self.__counter(True))
+        self.__wrap("capturable", self.__chain)
+        self.__wrap("order_moves", self.__branch) # Root moves (search_root); interior nodes order their moves in search_order
+        self.__wrap("search_order", self.__lazy_branch)
+        self.__wrap("backtrack", self.__branch)
+        for name, methods in TIMERS.items():
+            for method in methods:
+                self.__wrap(method, self.__timer(name))
+
+
+    def detach(self) -> None: # Restore the AI's own methods
+        for name in self.__wrapped:
+            delattr(self.__ai, name)
+        self.__wrapped.clear()
+
+
+    def get_stats(self) -> dict: # Return the stats of the last finished search
+        return self.__stats
+
+
+    def to_json(self) -> str: # Return the stats of the last finished search as JSON
+        return json.dumps(self.__stats)
+
+
+    def __wrap(self, name: str, make_wrapper) -> None: # Replace one method on the instance
+        setattr(self.__ai, name, make_wrapper(getattr(self.__ai, name)))
+        self.__wrapped.append(name)
+
+
+    def __root(self, method): # get_best_move: a depth 0 call is a whole search; deeper calls are minimax nodes
+        def wrapper(color, depth, *args, **kwargs):
+            if depth:
+                self.__nodes[depth] += 1
+                return method(color, depth, *args, **kwargs)
+
+            self.reset()
+            start = time.perf_counter()
+            if self.__profiler:
+                self.__profiler.enable()
+            try:
+                move = method(color, depth, *args, **kwargs)
+            finally:
+                if self.__profiler:
+                    self.__profiler.disable()
+
+            self.__stats = self.__collect(move, time.perf_counter() - start)
+            return move
+        return wrapper
+
+
+    def __counter(self, has_depth: bool): # Count nodes by their depth argument (search_root has none, it is depth 0)
+        def make_wrapper(method):
+            def wrapper(color, *args):
+                self.__nodes[args[0] if has_depth else 0] += 1
+                return method(color, *args)
+            return wrapper
+        return make_wrapper
+
+
+    def __chain(self, method): # Count capture chain generations (capturable recursion)
+        def wrapper(*args, **kwargs):
+            self.__chains += 1
+            return method(*args, **kwargs)
+        return wrapper
+
+
+    def __branch(self, method): # Moves searched at interior nodes give the branching factor (the root and minimax search every move)
+        def wrapper(moves, *args, **kwargs):
+            self.__interior += 1
+            self.__children += len(moves)
+            return method(moves, *args, **kwargs)
+        return wrapper
+
+
+    def __lazy_branch(self, method): # search_order: count only the moves yielded, since a cutoff stops the generator early
+        def wrapper(*args, **kwargs):
+            searched = 0
+            for move in method(*args, **kwargs):
+                self.__interior += not searched
+                self.__children += 1
+                searched += 1
+                yield move
+        return wrapper
+
+
+    def __timer(self, name: str): # Add the calls to and time spent in a method to a timer (exclusive: a nested timed call pauses the enclosing timer)
+        def make_wrapper(method):
+            def wrapper(*args, **kwargs):
+                self.__calls[name] += 1
+                running = self.__running
+                start = time.perf_counter()
+                if running: # evaluate generates moves, so that time only counts as move generation
+                    self.__seconds[running[-1][0]] += start - running[-1][1]
+                timing = [name, start]
+                running.append(timing)
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    end = time.perf_counter()
+                    running.pop()
+                    self.__seconds[name] += end - timing[1]
+                    if running:
+                        running[-1][1] = end
+            return wrapper
+        return make_wrapper
+
+
+    def __collect(self, move, seconds: float) -> dict: # Build the stats dict of the search that just finished
+        if self.__nodes and 0 not in self.__nodes: # A minimax root is not a separate call
+            self.__nodes[0] = 1
+
+        stats = {"move": list(move) if isinstance(move, tuple) else move,
+                 "seconds": seconds,
+                 "nodes": sum(self.__nodes.values()),
+                 "nodes_per_depth": {depth: self.__nodes[depth] for depth in sorted(self.__nodes)},
+                 "leaves": self.__calls["evaluate"],
+                 "capture_chains": self.__chains,
+                 "interior_nodes": self.__interior,
+                 "branching_factor": self.__children / self.__interior if self.__interior else 0.0}
+        for name in TIMERS:
+            stats[f"{name}_seconds"] = self.__seconds[name]
+
+        if self.__profiler:
+            output = io.StringIO()
+            pstats.Stats(self.__profiler, stream=output).sort_stats("cumulative").print_stats(self.__profile_lines)
+            stats["profile"] = output.getvalue()
+
+        return stats
+
+
+    def get_profiler(self) -> cProfile.Profile | None: # Return the last search's profiler (for pstats or dump_stats), if profiling
+        return self.__profiler
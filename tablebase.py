@@ -0,0 +1,174 @@
+import time
+import struct
+import argparse
+from itertools import combinations, product
+from bitboard import BitboardAI, SQUARES, TOP_ROW, BOTTOM_ROW
+from transposition import ZOBRIST, WHITE_TO_MOVE
+from records import RecordFile, write_records
+
+# Record: position key (with side to move), outcome for the side to move (1 win, -1 loss) and distance to the end of the game in plies
+# Drawn positions are not stored: a position covered by the tablebase that is missing from it is a draw
+RECORD = struct.Struct("<QbH")
+MAGIC = b"CTB" # Followed by one byte holding the maximum number of pieces
+WIN = 1
+DRAW = 0
+LOSS = -1
+
+# Piece kinds as (color, king)
+KINDS = ((1, False), (1, True), (-1, False), (-1, True))
+
+
+def bitboard_key(position: tuple, color: int) -> int: # Zobrist key of a (black, white, kings) position, equal to AI.get_key for the same board
+    black, white, kings = position
+    key = WHITE_TO_MOVE if -1 == color else 0
+    pieces = black | white
+    while pieces:
+        bit = pieces & -pieces
+        pieces ^= bit
+        x, y = SQUARES[bit.bit_length() - 1]
+        piece = (1 if bit & black else -1) * (2 if bit & kings else 1)
+        key ^= ZOBRIST[y][x][piece]
+
+    return key
+
+
+def layer_positions(num_pieces: int) -> list[tuple]: # Every position with num_pieces pieces and both colors present, for both sides to move
+    positions = []
+    for squares in combinations(range(32), num_pieces):
+        for kinds in product(KINDS, repeat=num_pieces):
+            black = white = kings = 0
+            for square, (color, king) in zip(squares, kinds):
+                bit = 1 << square
+                if not king and bit & (TOP_ROW if 1 == color else BOTTOM_ROW): # Men on their last row would already be kings
+                    break
+
+                if 1 == color:
+                    black |= bit
+                else:
+                    white |= bit
+                if king:
+                    kings |= bit
+
+            else:
+                if black and white:
+                    positions.append(((black, white, kings), 1))
+                    positions.append(((black, white, kings), -1))
+
+    return positions
+
+
+def solve_layer(num_pieces: int, solved: dict, engine: BitboardAI) -> dict: # Retrograde analysis of one piece count; captures lead into already solved smaller layers
+    positions = layer_positions(num_pieces)
+    index = {bitboard_key(position, color): idx for idx, (position, color) in enumerate(positions)}
+    count = len(positions)
+
+    predecessors = [[] for _ in range(count)]
+    pending = [0] * count # Children not yet known to be won by the opponent
+    longest = [0] * count # Longest opponent win among those children
+    buckets = {} # distance -> [(idx, outcome)] waiting to be finalized
+
+    for idx, (position, color) in enumerate(positions):
+        moves = engine.possible_captures(color, position) or engine.possible_moves(color, position)
+        if not moves: # The side to move loses immediately
+            buckets.setdefault(0, []).append((idx, LOSS))
+            continue
+
+        for move in moves:
+            child = engine.make_move(position, move)
+            key = bitboard_key(child, -color)
+            if key in index: # Same piece count - resolved by the retrograde pass
+                predecessors[index[key]].append(idx)
+                pending[idx] += 1
+                continue
+
+            # A capture: the child is terminal or belongs to a smaller layer
+            if not (child[0] if -color == 1 else child[1]):
+                outcome, distance = LOSS, 0
+            else:
+                outcome, distance = solved.get(key, (DRAW, 0))
+
+            if WIN == outcome:
+                longest[idx] = max(longest[idx], distance)
+            else:
+                pending[idx] += 1 # Drawn or lost children are never opponent wins, so this position cannot be lost
+                if LOSS == outcome:
+                    buckets.setdefault(distance + 1, []).append((idx, WIN))
+
+        if not pending[idx]: # Every move loses: the longest defence decides the distance
+            buckets.setdefault(longest[idx] + 1, []).append((idx, LOSS))
+
+    # Finalize positions in order of distance so every win is the fastest and every loss the slowest
+    values = [None] * count
+    distance = 0
+    while buckets:
+        for idx, outcome in buckets.pop(distance, []):
+            if values[idx] is not None:
+                continue
+
+            values[idx] = (outcome, distance)
+            for parent in predecessors[idx]:
+                if values[parent] is not None:
+                    continue
+
+                if LOSS == outcome:
+                    buckets.setdefault(distance + 1, []).append((parent, WIN))
+                else:
+                    pending[parent] -= 1
+                    longest[parent] = max(longest[parent], distance)
+                    if not pending[parent]:
+                        buckets.setdefault(longest[parent] + 1, []).append((parent, LOSS))
+
+        distance += 1
+
+    return {key: values[idx] for key, idx in index.items() if values[idx] is not None}
+
+
+def generate(path: str, max_pieces: int, verbose: bool = False) -> int: # Solve every layer up to max_pieces and write the tablebase; return the number of records
+    engine = BitboardAI()
+    solved = {}
+    for num_pieces in range(2, max_pieces + 1):
+        start = time.perf_counter()
+        layer = solve_layer(num_pieces, solved, engine)
+        solved.update(layer)
+        if verbose:
+            print(f"{num_pieces} pieces: {len(layer)} decided positions in {time.perf_counter() - start:.1f}s")
+
+    rows = [(key, outcome, distance) for key, (outcome, distance) in solved.items()]
+    return write_records(path, MAGIC + bytes([max_pieces]), RECORD, rows)
+
+
+class Tablebase:
+    def __init__(self, path: str) -> None:
+        self.__records = RecordFile(path, MAGIC, RECORD)
+        self.__max_pieces = self.__records.get_magic()[len(MAGIC)]
+
+
+    def __len__(self) -> int:
+        return len(self.__records)
+
+
+    def get_max_pieces(self) -> int: # Return the largest piece count the tablebase covers
+        return self.__max_pieces
+
+
+    def probe(self, key: int) -> tuple: # Return (outcome, distance) for the side to move of a covered position (both colors present, at most max_pieces pieces)
+        found = self.__records.find(key)
+        if not found:
+            return DRAW, 0
+
+        _, outcome, distance = found[0]
+        return outcome, distance
+
+
+    def close(self) -> None: # Release the memory mapping
+        self.__records.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the endgame tablebase by retrograde analysis")
+    parser.add_argument("--output", default="tablebase.bin", help="tablebase file to write")
+    parser.add_argument("--pieces", type=int, default=3, help="solve every position with up to this many pieces")
+    args = parser.parse_args()
+
+    count = generate(args.output, args.pieces, verbose=True)
+    print(f"Wrote {count} won/lost positions to {args.output}")
@@ -0,0 +1,26 @@
+import os
+import sys
+import random
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # The modules live at the repository root
+
+from ai import AI
+
+
+@pytest.fixture
+def positions() -> list[tuple]: # 60 (rows, side to move) pairs reached by random play from the start
+    rng = random.Random(1)
+    ai = AI()
+    positions = []
+    for _ in range(60):
+        ai.set_board(AI().get_board())
+        color = 1
+        for _ in range(rng.randrange(40)):
+            moves = ai.root_moves(color)
+            if not moves:
+                break
+            ai.make_move(rng.choice(moves))
+            color = -color
+        positions.append((ai.get_board(), color))
+    return positions
@@ -0,0 +1,39 @@
+import pytest
+
+from ai import AI
+
+
+def test_interrupted_search_restores_evaluation():
+    ai = AI()
+    ai.noise = False
+    expected = ai.evaluate(1)
+
+    # A stopped search raises out of the middle of the tree and has to roll the position back
+    ai.check_interval = 1
+    ai.stop()
+    assert ai.get_best_move(1, 0) is None
+    ai.resume()
+    assert ai.evaluate(1) == expected
+
+    # Time limited searches that run out of time part way
+    del ai.check_interval
+    for _ in range(5):
+        ai.get_best_move(1, 0, 5)
+    assert ai.evaluate(1) == expected
+    assert ai.get_board() == AI().get_board()
+
+
+def test_count_moves_matches_generated_moves(positions):
+    ai = AI()
+    for board, _ in positions:
+        ai.set_board(board)
+        for color in (1, -1):
+            captures, moves = ai.possible_captures(color), ai.possible_moves(color)
+            assert ai.count_moves(color) == (-1 if captures else len(moves))
+
+
+def test_time_limit_needs_alpha_beta():
+    ai = AI(alpha_beta=False)
+    with pytest.raises(ValueError):
+        ai.get_best_move(1, 0, 100)
+    assert isinstance(AI().get_best_move(1, 0, 100), tuple)
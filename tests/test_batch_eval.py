@@ -0,0 +1,28 @@
+from ai import AI
+from batch_eval import frontier_search
+
+
+def test_frontier_search_matches_minimax(monkeypatch, positions):
+    monkeypatch.setattr(AI, "noise", False)
+    monkeypatch.setattr(AI, "max_depth", 2)
+    for quiescence in (True, False):
+        monkeypatch.setattr(AI, "quiescence", quiescence)
+        for board, color in positions[:30]:
+            minimax = AI(alpha_beta=False)
+            minimax.set_board(board)
+            ai = AI()
+            ai.set_board(board)
+            assert frontier_search(ai, color) == minimax.get_best_move(color, 0)
+
+
+def test_frontier_search_follows_instance_noise(monkeypatch, positions):
+    monkeypatch.setattr(AI, "noise", True)
+    monkeypatch.setattr(AI, "max_depth", 2)
+    for board, color in positions[:30]:
+        minimax = AI(alpha_beta=False)
+        minimax.noise = False
+        minimax.set_board(board)
+        ai = AI()
+        ai.noise = False
+        ai.set_board(board)
+        assert frontier_search(ai, color) == minimax.get_best_move(color, 0)
@@ -0,0 +1,44 @@
+import pytest
+
+from ai import AI
+from bitboard import BitboardAI, from_rows
+
+
+def test_evaluate_follows_ai_settings(monkeypatch, positions):
+    monkeypatch.setattr(AI, "noise", False)
+    monkeypatch.setattr(AI, "weights", {**AI.weights, "king": 2.5, "center": 0.35})
+    ai = AI()
+    engine = BitboardAI()
+    for board, color in positions:
+        ai.set_board(board)
+        assert engine.evaluate(color, from_rows(board)) == ai.evaluate(color)
+
+
+def test_best_move_matches_ai(monkeypatch, positions):
+    monkeypatch.setattr(AI, "noise", False)
+    for quiescence in (True, False):
+        monkeypatch.setattr(AI, "quiescence", quiescence)
+        for board, color in positions[:30]:
+            ai = AI()
+            ai.set_board(board)
+            engine = BitboardAI()
+            engine.set_position(from_rows(board))
+            assert engine.get_best_move(color, 0) == ai.get_best_move(color, 0)
+
+
+def test_weights_and_depth_match_ai(monkeypatch, positions):
+    monkeypatch.setattr(AI, "noise", False)
+    weights = {"king": 2.5, "mobility": 0.2}
+    engine = BitboardAI(weights)
+    monkeypatch.setattr(AI, "max_depth", 2)
+    for board, color in positions[:20]:
+        ai = AI(weights=weights)
+        ai.set_board(board)
+        engine.set_position(from_rows(board))
+        assert engine.evaluate(color) == ai.evaluate(color)
+        assert engine.get_best_move(color, 0) == ai.get_best_move(color, 0)
+
+
+def test_unknown_weights_are_rejected():
+    with pytest.raises(ValueError):
+        BitboardAI({"kings": 2})
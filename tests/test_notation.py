@@ -0,0 +1,45 @@
+import io
+from ai import AI
+from notation import INITIAL_FEN, parse_fen, to_fen, to_binary, from_binary, parse_position, read_pdn, write_pdn, replay
+
+
+def test_positions_round_trip(positions):
+    assert parse_fen(INITIAL_FEN) == (AI().get_board(), 1)
+    for board, color in positions:
+        assert parse_fen(to_fen(board, color)) == (board, color)
+        assert from_binary(to_binary(board, color)) == (board, color)
+        assert parse_position(to_binary(board, color)) == parse_position(to_fen(board, color))
+
+
+def test_written_games_read_back_and_replay(monkeypatch):
+    monkeypatch.setattr(AI, "noise", False)
+    monkeypatch.setattr(AI, "max_depth", 2)
+    ai = AI()
+    color = 1
+    moves = []
+    for _ in range(30):
+        move = ai.get_best_move(color, 0)
+        if not isinstance(move, tuple):
+            break
+        moves.append(move)
+        ai.make_move(move)
+        color = -color
+
+    file = io.StringIO()
+    assert 1 == write_pdn(file, [{"headers": {"Event": "test"}, "moves": moves, "result": "*"}], line_length=30)
+    file.seek(0)
+    game, = read_pdn(file)
+    assert "test" == game["headers"]["Event"]
+    assert [move for _, _, move in replay(game, AI())] == moves
+
+
+def test_comments_and_variations_are_skipped():
+    text = ['[Event "annotated"]\n',
+            "1. 11-15 (1. 9-13 22-18) 22-18 {a comment (not a variation)\n",
+            "still a comment} 2. 15x22 (2. 8-11 (2... 25x18) 29-25 {best}) 25x18 1-0\n",
+            '[Event "next"]\n',
+            "1. 9-13 *\n"]
+    games = list(read_pdn(text))
+    assert [game["moves"] for game in games] == [["11-15", "22-18", "15x22", "25x18"], ["9-13"]]
+    assert ["1-0", "*"] == [game["result"] for game in games]
+    assert [len(list(replay(game, AI()))) for game in games] == [4, 1]
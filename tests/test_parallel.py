@@ -0,0 +1,16 @@
+from ai import AI
+from parallel import ParallelSearch
+
+
+def test_parallel_search_matches_serial_in_fewer_nodes_per_worker(monkeypatch, positions):
+    monkeypatch.setattr(AI, "noise", False)
+    monkeypatch.setattr(AI, "max_depth", 3)
+    search = ParallelSearch(2)
+    try:
+        for board, color in [(AI().get_board(), -1), (AI().get_board(), 1)] + positions[:10]:
+            stats = search.compare(board, color, 5)
+            assert stats["same_move"]
+            assert stats["parallel_nodes"] / stats["workers"] < stats["serial_nodes"]
+        assert 3 == AI.max_depth # compare sets the depth on its serial AI, not on the class
+    finally:
+        search.shutdown()
@@ -0,0 +1,59 @@
+from rules import Rules
+
+
+def empty_board() -> list[list[int]]:
+    return [[0] * 8 for _ in range(8)]
+
+
+def test_capture_only_side_is_not_stuck():
+    # Black's only man can't step forward, but it can jump the white man
+    board = empty_board()
+    board[7][0] = 1
+    board[6][1] = -1
+    rules = Rules()
+    rules.set_board(board)
+
+    assert not rules.can_move(1)
+    assert rules.has_moves(1)
+    assert rules.game_not_over(1)
+    assert "No One" == rules.winner()
+
+
+def test_blocked_side_loses():
+    # The jump's landing square is taken, so black has no move at all
+    board = empty_board()
+    board[7][0] = 1
+    board[6][1] = -1
+    board[5][2] = -1
+    rules = Rules()
+    rules.set_board(board)
+
+    assert not rules.has_moves(1)
+    assert not rules.game_not_over(1)
+    assert "White" == rules.winner()
+
+
+def test_stuck_side_to_move_loses():
+    # Black's men on the back row and the white men in front of them block each other, so neither side can move
+    board = empty_board()
+    for x in range(0, 8, 2):
+        board[7][x] = 1
+        board[6][x + 1] = -1
+        board[5][x] = -1
+    rules = Rules()
+    rules.set_board(board)
+
+    assert not rules.has_moves(0) and not rules.has_moves(1)
+    assert "Black" == rules.winner(0)
+    assert "White" == rules.winner(1)
+
+
+def test_early_exit_checks_match_legal(positions):
+    for board, _ in positions:
+        for color in (0, 1):
+            rules = Rules()
+            rules.set_board(board)
+            can_move, has_moves = rules.can_move(color), rules.has_moves(color)
+            captures, moves = rules.legal(color)
+            assert can_move == bool(moves)
+            assert has_moves == bool(captures or moves)
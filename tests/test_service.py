@@ -0,0 +1,38 @@
+import io
+import json
+import service
+from ai import AI
+from service import AnalysisService, run_stdio
+
+
+def test_forced_win_is_reported(monkeypatch):
+    monkeypatch.setattr(AI, "noise", False)
+    monkeypatch.setattr(service, "_worker_ai", AI())
+
+    # Black jumps white's last man
+    board = [[0] * 8 for _ in range(8)]
+    board[6][1] = 1
+    board[5][2] = -1
+    result = service._analyze(board, 1, 3, None)
+    assert result["score"] is None and "black" == result["forced_win"]
+
+    # White to move has no pieces left to move with
+    result = service._analyze([[0] * 8 for _ in range(7)] + [[0, 1, 0, 0, 0, 0, 0, 0]], -1, 3, None)
+    assert result["move"] is None and "black" == result["forced_win"]
+
+    result = service._analyze(AI().get_board(), 1, 2, None)
+    assert isinstance(result["score"], float) and result["forced_win"] is None
+
+
+def test_invalid_json_is_counted():
+    analysis = AnalysisService(workers=1)
+    try:
+        output = io.StringIO()
+        run_stdio(analysis, ["not json\n", '{"id": 1, "fen": "B:W21-32:B1-12", "depth": 1}\n'], output)
+        responses = [json.loads(line) for line in output.getvalue().splitlines()]
+        stats = analysis.get_stats()
+    finally:
+        analysis.shutdown()
+
+    assert {None, 1} == {response["id"] for response in responses}
+    assert 2 == stats["requests"] and 1 == stats["errors"]
@@ -0,0 +1,30 @@
+from ai import AI
+from stats import TIMERS
+
+
+def test_branching_factor_counts_every_searched_move(monkeypatch):
+    monkeypatch.setattr(AI, "noise", False)
+    for alpha_beta in (True, False):
+        ai = AI(alpha_beta=alpha_beta)
+        ai.max_depth = 3
+        ai.enable_stats()
+        ai.get_best_move(1, 0)
+        ai.max_depth = 4
+        ai.get_best_move(1, 0) # The stored best moves are searched first and cause cutoffs before the other moves are generated
+        stats = ai.get_stats()
+
+        # Every searched move leads to exactly one node, so the moves counted must add up to the nodes below the root
+        assert round(stats["branching_factor"] * stats["interior_nodes"]) == stats["nodes"] - 1
+
+
+def test_timers_do_not_overlap(monkeypatch):
+    monkeypatch.setattr(AI, "noise", False)
+    ai = AI()
+    ai.max_depth = 4
+    ai.enable_stats()
+    ai.get_best_move(1, 0)
+    stats = ai.get_stats()
+
+    timers = [stats[f"{name}_seconds"] for name in TIMERS]
+    assert all(seconds > 0 for seconds in timers)
+    assert sum(timers) <= stats["seconds"]
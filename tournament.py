@@ -0,0 +1,258 @@
+import os
+import sys
+import json
+import math
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from ai import AI
+from rules import Rules
+from notation import parse_fen, to_fen, move_to_pdn
+
+# Engine config keys: AI constructor arguments, AI attributes set on the instance, and the per-move time limit
+CONSTRUCTOR_OPTIONS = ("alpha_beta", "table_size", "weights")
+ENGINE_OPTIONS = ("max_depth", "max_iterations", "quiescence", "max_quiescence", "keep_table", "noise", "window")
+MAX_PLIES = 400 # Games still running after this many plies are drawn (the 80-move rule normally ends them first)
+
+
+def make_engine(config: dict) -> AI: # Build an AI from a config such as {"name": "d4", "max_depth": 4, "weights": {"king": 3.5}, "quiescence": False} (weights may be a file path)
+    unknown = set(config) - set(CONSTRUCTOR_OPTIONS) - set(ENGINE_OPTIONS) - {"name", "time_limit"}
+    if unknown:
+        raise ValueError(f"unknown engine options: {', '.join(sorted(unknown))}")
+    if config.get("time_limit") is not None and not config.get("alpha_beta", True):
+        raise ValueError("time_limit needs the alpha-beta search")
+
+    options = {key: config[key] for key in CONSTRUCTOR_OPTIONS if key in config}
+    if isinstance(options.get("weights"), str): # Path of a weights file
+        options["weights"] = AI.load_weights(options["weights"])
+
+    engine = AI(**options)
+    for key in ENGINE_OPTIONS:
+        if key in config:
+            setattr(engine, key, config[key])
+    return engine
+
+
+def check_move(rules: Rules, move: tuple, color: int) -> bool: # Play an engine's move on the rules board one step at a time, checking each step is legal there
+    code = 1 if 1 == color else 0 # Checker color code
+    captures, moves = rules.legal(code)
+    if not move[0]: # Simple moves are only legal when there is nothing to capture
+        if captures or (move[3], move[4]) not in moves.get((move[1], move[2]), []):
+            return False
+        rules.make_ai_move(move)
+        return True
+
+    for i in range(1, 2 * move[0], 2):
+        start, landing = (move[i], move[i + 1]), (move[i + 2], move[i + 3])
+        if landing not in rules.legal(code)[0].get(start, []):
+            return False
+        rules.make_ai_move((1, *start, *landing))
+
+    return True
+
+
+def play_game(configs: tuple[dict, dict], fen: str, black: int) -> dict: # Play one game between two engine configs from an opening; configs[black] plays black
+    rules, color = Rules.from_position(fen)
+    engines = [make_engine(config) for config in configs]
+    sides = {1: black, -1: 1 - black} # Color -> index of the engine playing it
+    seconds = [0.0, 0.0]
+    nodes = [0, 0]
+    moves = [0, 0]
+    record = []
+    illegal = False
+
+    result = 0 # From black's side: 1 black won, -1 white won, 0 draw
+    for _ in range(MAX_PLIES):
+        code = 1 if 1 == color else 0
+        if not rules.game_not_over(code):
+            winner = rules.winner(code)
+            result = 1 if "Black" == winner else -1 if "White" == winner else 0
+            break
+
+        idx = sides[color]
+        engine = engines[idx]
+        engine.set_board([[rules.get_piece(x, y) for x in range(8)] for y in range(8)])
+        start = time.perf_counter()
+        move = engine.get_best_move(color, 0, configs[idx].get("time_limit"))
+        seconds[idx] += time.perf_counter() - start
+        nodes[idx] += engine.get_nodes()
+        moves[idx] += 1
+
+        if not isinstance(move, tuple) or not check_move(rules, move, color): # An illegal move loses
+            result = -color
+            illegal = True
+            break
+
+        record.append(move_to_pdn(move))
+        color = -color
+
+    # Score of configs[0]: 1 win, 0.5 draw, 0 loss
+    score = 0.5 if not result else float((1 == result) == (0 == black))
+    return {"fen": fen, "black": configs[black].get("name", black), "moves": record, "result": result, "illegal": illegal,
+            "score": score, "seconds": seconds, "nodes": nodes, "engine_moves": moves}
+
+
+def openings(plies: int) -> list[str]: # Every distinct position reached after `plies` moves from the initial position, as FEN
+    ai = AI()
+    positions = {ai.get_key(1): to_fen(ai.get_board(), 1)}
+    for ply in range(plies):
+        color = 1 if 0 == ply % 2 else -1
+        frontier = {}
+        for fen in positions.values():
+            board, _ = parse_fen(fen)
+            ai.set_board(board)
+            for move in ai.root_moves(color):
+                ai.make_move(move)
+                frontier[ai.get_key(-color)] = to_fen(ai.get_board(), -color)
+                ai.undo_move()
+        positions = frontier
+
+    return list(positions.values())
+
+
+def elo(score: float) -> float: # Elo difference that gives the expected score
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+
+def expected_score(elo_diff: float) -> float: # Expected score for an Elo difference
+    return 1 / (1 + 10 ** (-elo_diff / 400))
+
+
+class Match: # W/D/L of the first engine against the second with an Elo estimate and an SPRT
+    def __init__(self, elo0: float = 0.0, elo1: float = 5.0, alpha: float = 0.05, beta: float = 0.05) -> None:
+        self.__elo0 = elo0 # Null hypothesis: the first engine is elo0 stronger
+        self.__elo1 = elo1 # Alternative: it is elo1 stronger
+        self.__lower = math.log(beta / (1 - alpha)) # Accept H0 below this log-likelihood ratio
+        self.__upper = math.log((1 - beta) / alpha) # Accept H1 above it
+        self.__wins = self.__draws = self.__losses = 0
+        self.__illegal = 0 # Games lost by an illegal move
+        self.__seconds = [0.0, 0.0]
+        self.__nodes = [0, 0]
+        self.__moves = [0, 0]
+
+
+    def add(self, game: dict) -> None: # Count a game returned by play_game
+        if 1 == game["score"]:
+            self.__wins += 1
+        elif 0 == game["score"]:
+            self.__losses += 1
+        else:
+            self.__draws += 1
+        self.__illegal += game["illegal"]
+
+        for idx in range(2):
+            self.__seconds[idx] += game["seconds"][idx]
+            self.__nodes[idx] += game["nodes"][idx]
+            self.__moves[idx] += game["engine_moves"][idx]
+
+
+    def games(self) -> int:
+        return self.__wins + self.__draws + self.__losses
+
+
+    def score(self) -> float: # Mean score of the first engine
+        return (self.__wins + self.__draws / 2) / self.games() if self.games() else 0.5
+
+
+    def variance(self) -> float: # Variance of a single game's score
+        score = self.score()
+        return (self.__wins * (1 - score) ** 2 + self.__draws * (0.5 - score) ** 2 + self.__losses * score ** 2) / self.games() if self.games() else 0.0
+
+
+    def elo(self) -> tuple[float, float]: # Elo difference and the half width of its 95% confidence interval
+        if not self.games():
+            return 0.0, float("inf")
+
+        score = self.score()
+        margin = 1.96 * math.sqrt(self.variance() / self.games())
+        return elo(score), (elo(score + margin) - elo(score - margin)) / 2
+
+
+    def llr(self) -> float: # Log-likelihood ratio of elo1 against elo0 (normal approximation of the trinomial model)
+        variance = self.variance()
+        if not variance:
+            return 0.0
+
+        score0, score1 = expected_score(self.__elo0), expected_score(self.__elo1)
+        return self.games() * (score1 - score0) * (2 * self.score() - score0 - score1) / (2 * variance)
+
+
+    def sprt(self) -> str | None: # "H1" (the first engine is stronger by elo1), "H0" (not stronger than elo0) or None while undecided
+        llr = self.llr()
+        if llr >= self.__upper:
+            return "H1"
+        if llr <= self.__lower:
+            return "H0"
+        return None
+
+
+    def get_stats(self) -> dict:
+        elo_diff, margin = self.elo()
+        return {"games": self.games(),
+                "wins": self.__wins,
+                "draws": self.__draws,
+                "losses": self.__losses,
+                "illegal": self.__illegal,
+                "score": self.score(),
+                "elo": elo_diff,
+                "elo_error": margin,
+                "llr": self.llr(),
+                "llr_bounds": [self.__lower, self.__upper],
+                "sprt": self.sprt(),
+                "seconds_per_move": [self.__seconds[idx] / self.__moves[idx] if self.__moves[idx] else 0.0 for idx in range(2)],
+                "nodes_per_move": [self.__nodes[idx] / self.__moves[idx] if self.__moves[idx] else 0.0 for idx in range(2)]}
+
+
+def run_match(configs: tuple[dict, dict], fens: list[str], games: int | None = None, workers: int | None = None,
+              match: Match | None = None, sprt: bool = True, progress=None) -> Match: # Play the openings (each with both colors) on all cores until done or the SPRT decides
+    match = match or Match()
+    games = games or 2 * len(fens)
+    tasks = [(fens[(idx // 2) % len(fens)], idx % 2) for idx in range(games)] # Pairs of games with the colors swapped
+
+    pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+    futures = [pool.submit(play_game, configs, fen, black) for fen, black in tasks]
+    try:
+        for future in as_completed(futures):
+            match.add(future.result())
+            if progress:
+                progress(match)
+            if sprt and match.sprt():
+                break
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True) # Once the SPRT has decided, queued games are dropped instead of played
+
+    return match
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play two engine configs against each other from a set of openings on all cores")
+    parser.add_argument("engines", nargs=2, type=json.loads, help='JSON engine configs, e.g. \'{"name": "d4", "max_depth": 4}\'; the first is tested against the second')
+    parser.add_argument("--openings", default=None, help="file with one FEN per line (default: every position after --plies moves)")
+    parser.add_argument("--plies", type=int, default=2, help="opening depth when no --openings file is given")
+    parser.add_argument("--games", type=int, default=None, help="games to play (default: every opening with both colors)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--elo0", type=float, default=0.0, help="SPRT null hypothesis Elo")
+    parser.add_argument("--elo1", type=float, default=5.0, help="SPRT alternative hypothesis Elo")
+    parser.add_argument("--alpha", type=float, default=0.05, help="SPRT false positive rate")
+    parser.add_argument("--beta", type=float, default=0.05, help="SPRT false negative rate")
+    parser.add_argument("--no-sprt", action="store_true", help="play every game even if the SPRT has decided")
+    args = parser.parse_args()
+
+    for engine in args.engines:
+        make_engine(engine) # Fail on bad configs before starting the pool
+
+    if args.openings:
+        with open(args.openings) as file:
+            fens = [line.strip() for line in file if line.strip()]
+    else:
+        fens = openings(args.plies)
+
+    def progress(match: Match) -> None:
+        stats = match.get_stats()
+        print(f"\rgames {stats['games']}  +{stats['wins']} ={stats['draws']} -{stats['losses']}  "
+              f"elo {stats['elo']:+.1f} +/- {stats['elo_error']:.1f}  llr {stats['llr']:+.2f}", end="", file=sys.stderr)
+
+    match = run_match(tuple(args.engines), fens, args.games, args.workers, Match(args.elo0, args.elo1, args.alpha, args.beta), not args.no_sprt, progress)
+    print(file=sys.stderr)
+    print(json.dumps(match.get_stats(), indent=2))
@@ -0,0 +1,111 @@
+from random import Random
+
+# Zobrist keys: one random 64 bit number per (square, piece) pair. The generator is seeded so keys are stable across runs
+_rng = Random(0x5EED)
+ZOBRIST = [[{piece: _rng.getrandbits(64) for piece in (-2, -1, 1, 2)} for x in range(8)] for y in range(8)]
+WHITE_TO_MOVE = _rng.getrandbits(64) # XORed into the key when white (-1) is to move
+
+# Bound types of stored scores
+EXACT = 0
+LOWER = 1 # Score is a lower bound (search failed high)
+UPPER = 2 # Score is an upper bound (search failed low)
+
+
+def position_key(board: list[list[int]], color: int) -> int: # Compute the Zobrist key of a position from scratch
+    key = WHITE_TO_MOVE if -1 == color else 0
+    for y in range(8):
+        for x in range(8):
+            if board[y][x]:
+                key ^= ZOBRIST[y][x][board[y][x]]
+
+    return key
+
+
+class TranspositionTable:
+    # Static Variables
+    default_size = 1 << 16
+
+    def __init__(self, size: int = default_size) -> None:
+        # Memory is capped at `size` entries, split into buckets of two slots:
+        # a depth-preferred slot that keeps the deepest search and an always-replace slot for the most recent one
+        self.__buckets = max(1, size // 2)
+        self.__deep = [None] * self.__buckets
+        self.__recent = [None] * self.__buckets
+        self.__ages = [0] * self.__buckets # Search generation that stored each depth-preferred entry
+        self.__generation = 0
+
+        self.__probes = 0
+        self.__hits = 0
+        self.__stores = 0
+        self.__replacements = 0
+        self.__occupied = 0
+
+
+    def probe(self, key: int) -> tuple | None: # Return (key, depth, score, bound, move) stored for the key, if any
+        self.__probes += 1
+        idx = key % self.__buckets
+
+        entry = self.__deep[idx]
+        if entry is None or entry[0] != key:
+            entry = self.__recent[idx]
+            if entry is None or entry[0] != key:
+                return None
+
+        self.__hits += 1
+        return entry
+
+
+    def store(self, key: int, depth: int, score: float, bound: int, move: tuple | None) -> None: # Store a search result using the replacement policy
+        self.__stores += 1
+        idx = key % self.__buckets
+        entry = (key, depth, score, bound, move) # The move tuple itself is kept, so a hit hands it back without decoding
+
+        deep = self.__deep[idx]
+        # Deeper (or same position) results take the depth-preferred slot, as do all results once its entry is from an older search
+        if deep is None or deep[0] == key or depth >= deep[1] or self.__ages[idx] != self.__generation:
+            if deep is None:
+                self.__occupied += 1
+            elif deep[0] != key:
+                self.__replacements += 1
+                self.__demote(idx, deep) # Displaced entry still gets a chance in the always-replace slot
+
+            self.__deep[idx] = entry
+            self.__ages[idx] = self.__generation
+            recent = self.__recent[idx]
+            if recent is not None and recent[0] == key: # Avoid keeping a stale duplicate
+                self.__recent[idx] = None
+                self.__occupied -= 1
+
+        else:
+            self.__demote(idx, entry)
+
+
+    def __demote(self, idx: int, entry: tuple) -> None: # Put an entry in the always-replace slot
+        recent = self.__recent[idx]
+        if recent is None:
+            self.__occupied += 1
+        elif recent[0] != entry[0]:
+            self.__replacements += 1
+
+        self.__recent[idx] = entry
+
+
+    def new_search(self) -> None: # Start a new search generation; entries from earlier searches stay until newer results need their slot
+        self.__generation += 1
+
+
+    def clear(self) -> None: # Remove all entries and reset the counters
+        self.__init__(2 * self.__buckets)
+
+
+    def get_stats(self) -> dict: # Return usage counters
+        capacity = 2 * self.__buckets
+        return {"probes": self.__probes,
+                "hits": self.__hits,
+                "hit_rate": self.__hits / self.__probes if self.__probes else 0.0,
+                "stores": self.__stores,
+                "replacements": self.__replacements,
+                "entries": self.__occupied,
+                "capacity": capacity,
+                "generation": self.__generation,
+                "occupancy": self.__occupied / capacity}
@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from ai import AI
+from batch_eval import features_batch
+from notation import RESULT_SCORES, read_pdn, write_pdn, replay
+from tournament import openings, play_game
+
+FEATURES_FILE = "features.f32" # N x len(AI.weights) float32 rows, one per position
+TARGETS_FILE = "targets.f32" # N float32 game results from black's side (1 win, 0.5 draw, 0 loss)
+META_FILE = "meta.json" # Row count and column names
+CHUNK = 1 << 16 # Positions handled per batch when extracting and fitting
+
+
+def selfplay(path: str, games: int, config: dict, plies: int = 4, workers: int | None = None) -> int: # Play games of an engine config against itself from random-ish openings and write them as PDN
+    fens = openings(plies)
+    results = {1: "1-0", -1: "0-1", 0: "1/2-1/2"}
+
+    def finished(futures):
+        for future in as_completed(futures):
+            game = future.result()
+            yield {"headers": {"FEN": game["fen"], "Result": results[game["result"]]}, "moves": game["moves"], "result": results[game["result"]]}
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool, open(path, "w") as file:
+        futures = [pool.submit(play_game, (config, config), fens[idx % len(fens)], 0) for idx in range(games)]
+        return write_pdn(file, finished(futures))
+
+
+def extract(paths: list[str], directory: str, skip_plies: int = 0) -> int: # Stream PDN games into the feature/target files; return the number of positions written
+    os.makedirs(directory, exist_ok=True)
+    ai = AI(table_size=0)
+    rows = 0
+    boards, colors, captures, moves, targets = [], [], [], [], []
+
+    with open(os.path.join(directory, FEATURES_FILE), "wb") as features_file, open(os.path.join(directory, TARGETS_FILE), "wb") as targets_file:
+        def flush() -> None:
+            if boards:
+                features_file.write(features_batch(boards, colors, captures, moves).tobytes())
+                targets_file.write(np.asarray(targets, dtype=np.float32).tobytes())
+            for batch in (boards, colors, captures, moves, targets):
+                batch.clear()
+
+        for path in paths:
+            with open(path) as file:
+                for game in read_pdn(file):
+                    if game["result"] not in RESULT_SCORES:
+                        continue
+
+                    for ply, (board, color, _) in enumerate(replay(game, ai)):
+                        if ply < skip_plies:
+                            continue
+                        # The generator is paused before the move, so the AI is still on this position
+                        boards.append(board)
+                        colors.append(color)
+                        captures.append(len(ai.possible_captures(color)))
+                        moves.append(0 if captures[-1] else len(ai.possible_moves(color)))
+                        targets.append(RESULT_SCORES[game["result"]])
+                        rows += 1
+                        if len(boards) >= CHUNK:
+                            flush()
+        flush()
+
+    with open(os.path.join(directory, META_FILE), "w") as file:
+        json.dump({"rows": rows, "columns": list(AI.weights)}, file)
+
+    return rows
+
+
+def load_dataset(directory: str) -> tuple[np.memmap, np.memmap]: # Memory-map the features (N x columns) and targets (N) written by extract
+    with open(os.path.join(directory, META_FILE)) as file:
+        meta = json.load(file)
+    if meta["columns"] != list(AI.weights):
+        raise ValueError(f"dataset columns {meta['columns']} do not match AI.weights {list(AI.weights)}")
+
+    if not meta["rows"]:
+        return np.zeros((0, len(meta["columns"])), dtype=np.float32), np.zeros(0, dtype=np.float32)
+
+    features = np.memmap(os.path.join(directory, FEATURES_FILE), dtype=np.float32, mode="r", shape=(meta["rows"], len(meta["columns"])))
+    targets = np.memmap(os.path.join(directory, TARGETS_FILE), dtype=np.float32, mode="r", shape=(meta["rows"],))
+    return features, targets
+
+
+def fit(features: np.ndarray, targets: np.ndarray, iterations: int = 25, ridge: float = 1e-6, tolerance: float = 1e-8) -> tuple[np.ndarray, float]:
+    # Logistic regression of the results on the features by Newton's method; the loss (cross-entropy against 0/0.5/1 results) is convex,
+    # so this converges in a handful of passes over the data. Returns the coefficients and the mean loss
+    rows, columns = features.shape
+    coefficients = np.zeros(columns)
+    loss = float("nan")
+    for _ in range(iterations):
+        gradient = ridge * rows * coefficients
+        hessian = ridge * rows * np.eye(columns)
+        loss = 0.0
+        for start in range(0, rows, CHUNK):
+            x = np.asarray(features[start:start + CHUNK], dtype=np.float64)
+            y = np.asarray(targets[start:start + CHUNK], dtype=np.float64)
+            p = 1 / (1 + np.exp(-(x @ coefficients)))
+            gradient += x.T @ (p - y)
+            hessian += (x * (p * (1 - p))[:, None]).T @ x
+            p = np.clip(p, 1e-12, 1 - 1e-12)
+            loss -= float(np.sum(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+        step = np.linalg.solve(hessian, gradient)
+        coefficients -= step
+        if np.max(np.abs(step)) < tolerance:
+            break
+
+    return coefficients, loss / rows
+
+
+def texel_error(features: np.ndarray, targets: np.ndarray, weights: dict) -> tuple[float, float]: # Fit the scale K of a weight set; return (K, mean squared error of sigmoid(K * evaluation) against the results)
+    vector = np.array([weights[name] for name in AI.weights])
+    evaluations = np.concatenate([np.asarray(features[start:start + CHUNK], dtype=np.float64) @ vector for start in range(0, len(features), CHUNK)])
+    (scale,), _ = fit(evaluations[:, None], targets)
+    error = float(np.mean((1 / (1 + np.exp(-scale * evaluations)) - targets) ** 2))
+    return float(scale), error
+
+
+def tune(directory: str, path: str) -> dict: # Fit weights to a dataset and save them where AI.load_weights can read them
+    features, targets = load_dataset(directory)
+    if not len(targets):
+        raise ValueError(f"no positions in {directory}")
+
+    start = time.perf_counter()
+    coefficients, loss = fit(features, targets)
+    names = list(AI.weights)
+    scale = coefficients[names.index("man")]
+    if scale <= 0:
+        raise ValueError("fitted man weight is not positive; the dataset is too small or one-sided")
+
+    # Search only compares evaluations, so the weights are rescaled to keep a man worth 1 like the defaults
+    weights = {name: float(coefficient / scale) for name, coefficient in zip(names, coefficients)}
+    report = {"weights": weights,
+              "positions": len(targets),
+              "loss": loss,
+              "seconds": time.perf_counter() - start,
+              "default_error": texel_error(features, targets, AI.weights)[1],
+              "error": texel_error(features, targets, weights)[1],
+              "scale": float(scale)}
+
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune the evaluation weights on self-play games")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    play = commands.add_parser("selfplay", help="play games and write them as PDN")
+    play.add_argument("--games", type=int, default=1000)
+    play.add_argument("--depth", type=int, default=2, help="AI.max_depth of the players")
+    play.add_argument("--plies", type=int, default=4, help="opening depth")
+    play.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    play.add_argument("--output", default="selfplay.pdn")
+
+    features = commands.add_parser("extract", help="write the feature vectors of every position in PDN files")
+    features.add_argument("pdn", nargs="+")
+    features.add_argument("--data", default="tuning_data", help="dataset directory")
+    features.add_argument("--skip-plies", type=int, default=0, help="ignore each game's first plies")
+
+    weights = commands.add_parser("fit", help="fit the weights to a dataset and save them")
+    weights.add_argument("--data", default="tuning_data", help="dataset directory")
+    weights.add_argument("--output", default="weights.json", help="weights file (game.py loads weights.json)")
+    args = parser.parse_args()
+
+    if "selfplay" == args.command:
+        print(f"{selfplay(args.output, args.games, {'max_depth': args.depth, 'noise': True}, args.plies, args.workers)} games written to {args.output}")
+    elif "extract" == args.command:
+        print(f"{extract(args.pdn, args.data, args.skip_plies)} positions written to {args.data}")
+    else:
+        print(json.dumps(tune(args.data, args.output), indent=2))